@@ -0,0 +1,1166 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2019 Nicholas H.Tollervey for Adafruit Industries
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+`adafruit_radio`
+================================================================================
+
+Simple byte and string based inter-device communication via BLE.
+
+
+* Author(s): Nicholas H.Tollervey for Adafruit Industries
+
+**Hardware:**
+
+   Adafruit Feather nRF52840 Express <https://www.adafruit.com/product/4062>
+   Adafruit Circuit Playground Bluefruit <https://www.adafruit.com/product/4333>
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://github.com/adafruit/circuitpython/releases
+
+"""
+# pylint: disable=too-many-lines
+import time
+import struct
+import random
+from adafruit_ble import BLERadio
+from adafruit_ble.advertising.adafruit import AdafruitRadio
+from adafruit_radio.buffers import MessagePool, Queue, Reassembler
+from adafruit_radio.dispatch import Dispatcher
+from adafruit_radio.reliable import ACK, ACK_LENGTH, HEADER_LENGTH, MAX_WINDOW
+from adafruit_radio.reliable import MAX_SENDERS, Receiver, Sender
+from adafruit_radio import relay as _relay
+from adafruit_radio import schedule as _schedule
+from adafruit_radio.stats import Stats
+
+
+__version__ = "0.0.0-auto.0"
+__repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_radio.git"
+
+
+#: Maximum length of a message (in bytes).
+MAX_LENGTH = 248
+
+#: Amount of time to advertise a message (in seconds).
+AD_DURATION = 0.5
+
+#: Shortest advertising duration (in seconds) used in adaptive mode.
+MIN_AD_DURATION = 0.05
+
+#: Longest advertising duration (in seconds) used in adaptive mode.
+MAX_AD_DURATION = 2.0
+
+#: Default number of received messages held while listening.
+QUEUE_SIZE = 16
+
+#: Maximum number of recent messages remembered to detect duplicates.
+POOL_SIZE = 64
+
+#: Longest time (in seconds) to wait for the rest of a fragmented message.
+FRAGMENT_TIMEOUT = 5
+
+#: Maximum number of bytes held while reassembling fragmented messages.
+REASSEMBLY_SIZE = 8192
+
+#: Send queue overflow policy: drop the oldest queued message to make room.
+DROP_OLDEST = 0
+
+#: Send queue overflow policy: drop the message being sent.
+DROP_NEWEST = 1
+
+
+class Radio:  # pylint: disable=too-many-instance-attributes
+    """
+    Represents a connection through which one can send or receive strings
+    and bytes. The radio can be tuned to a specific channel upon initialisation
+    or via the `configure` method.
+    """
+
+    def __init__(self, ble=None, clock=None, **args):
+        """
+        Takes the same configuration arguments as the `configure` method.
+
+        :param ble: The BLE radio used to send and receive, by default a new
+            `adafruit_ble.BLERadio`. Any object with the same advertising and
+            scanning methods may be used instead, such as the simulated radios
+            in `adafruit_radio.sim`.
+        :param clock: Where the time comes from: an object with
+            ``monotonic()`` and ``sleep()`` functions, by default the `time`
+            module.
+        """
+        # For BLE related operations.
+        self.ble = BLERadio() if ble is None else ble
+        self._time = time if clock is None else clock
+        # The uid for outgoing message. Incremented by one on each send, up to
+        # 255 (or 65535 if wide) when it's reset to 0.
+        self.uid = 0
+        self._wide_uid = False
+        # Maps the address of each sender heard to [last uid, number of
+        # messages missed], to detect gaps in its uids.
+        self._senders = {}
+        # Contains timestamped message metadata to mitigate report of
+        # receiving of duplicate messages within AD_DURATION time frame.
+        self.msg_pool = MessagePool(POOL_SIZE)
+        # Received messages waiting to be returned, in a queue per channel
+        # subscribed to, and the persistent scan used when the radio is
+        # listening (see `start_listening`).
+        self._rx_queues = {42: Queue(QUEUE_SIZE)}
+        self._extra_channels = ()
+        self._listening = False
+        self._scan = None
+        self._scan_timeout = 1
+        # Advertisements are ignored if weaker than the minimum RSSI, from a
+        # sender not in the allow list (if there is one) or from a sender in
+        # the deny list.
+        self._minimum_rssi = -255
+        self._allow = None
+        self._deny = frozenset()
+        # Outgoing advertisements waiting to be sent and the time at which
+        # the one currently being advertised should stop (see `update`).
+        self._tx_queue = None
+        self._overflow = DROP_OLDEST
+        self._advertising_until = None
+        # The advertisement and buffer reused for every outgoing message.
+        self._advertisement = AdafruitRadio()
+        self._tx_buffer = bytearray(2 + MAX_LENGTH)
+        # Handle user related configuration.
+        self._channel = 42
+        self._batch = False
+        self._duration = AD_DURATION
+        # Counts of new and duplicate messages heard, used to adjust the
+        # advertising duration in adaptive mode.
+        self._adaptive = False
+        self._heard = 0
+        self._duplicates = 0
+        # Reassembles fragmented messages (if fragmenting) and the id of the
+        # next message to be sent in fragments.
+        self._reassembler = None
+        self._fragment_id = 0
+        # Number, acknowledge and resend messages in reliable mode.
+        self._sender = None
+        self._receiver = None
+        # Adds relay headers and relays messages, in relay mode.
+        self._relay = None
+        # When the radio's slot is, if only sending in its slot.
+        self._schedule = None
+        # Counts of what's been sent and heard (see `adafruit_radio.stats`).
+        self.stats = Stats()
+        # Maps channels to the handlers registered with `on_message`.
+        self._dispatchers = {}
+        self.configure(**args)
+
+    def configure(
+        self,
+        channel=None,
+        channels=None,
+        send_queue_size=None,
+        overflow=None,
+        batch=None,
+        fragment=None,
+        duration=None,
+        adaptive=None,
+        reliable=None,
+        window=None,
+        wide_uid=None,
+        minimum_rssi=None,
+        allow=None,
+        deny=None,
+        relay=None,
+        ttl=None,
+        slots=None,
+        slot=None,
+        slot_time=None,
+        beacon=None,
+    ):  # pylint: disable=too-many-arguments,too-many-locals
+        """
+        Set configuration values for the radio. Settings which are not given
+        keep their current value.
+
+        :param int channel: The channel (0-255) the radio is listening /
+            broadcasting on (default 42).
+        :param channels: Other channels (0-255) to listen on as well. Messages
+            from each channel are queued separately and read by passing the
+            channel to `receive`, `receive_full` or `receive_iter`.
+        :param int send_queue_size: If greater than zero, `send` and
+            `send_bytes` queue up to this many messages and return at once,
+            leaving `update` to advertise them in turn. If zero (the default)
+            sending blocks for AD_DURATION.
+        :param int overflow: What to do when sending to a full queue: either
+            `DROP_OLDEST` (the default) or `DROP_NEWEST`.
+        :param bool batch: If True, as many queued messages as fit are sent
+            together in a single advertisement, each prefixed by its length.
+            Radios sending and receiving batches must all have this set.
+            Empty messages are not sent in batches.
+        :param bool fragment: If True, messages longer than will fit in an
+            advertisement are split into fragments (of up to 255) and
+            reassembled by the receiver. Each message carries a three byte
+            fragment header, so radios sending and receiving must all have
+            this set.
+        :param float duration: How long (in seconds) to advertise each
+            message (default AD_DURATION). Copies of a message received
+            within this time of the first are ignored as duplicates.
+        :param bool adaptive: If True, the advertising duration is adjusted
+            (between MIN_AD_DURATION and MAX_AD_DURATION) according to how
+            many copies of each message are received from other radios:
+            shorter if most messages are heard several times, longer if most
+            are heard only once. Duplicates are then ignored for up to
+            MAX_AD_DURATION.
+        :param bool reliable: If True, each message is resent until another
+            radio acknowledges it (or it's been sent `reliable.MAX_TRIES`
+            times), and resent copies are ignored. Acknowledgements are sent
+            on the radio's channel, so reliable radios should share one and
+            must call `update` regularly.
+        :param int window: The number of reliable messages (up to
+            `reliable.MAX_WINDOW`, default 8) sent before waiting for them to
+            be acknowledged.
+        :param bool wide_uid: If True, each message carries a two byte uid
+            (0-65535) rather than a single byte, so a radio sending many
+            messages doesn't reuse a uid while receivers still remember it
+            (in which case they'd ignore the new message as a duplicate).
+            This leaves one byte less for the message. Radios sending and
+            receiving must all have this set.
+        :param int minimum_rssi: Advertisements received with a signal
+            strength below this (default -255) are ignored by the scan
+            itself.
+        :param allow: If not empty, only messages from senders whose
+            ``address_bytes`` are in this collection are received. Pass an
+            empty collection to receive from any sender (the default).
+        :param deny: Messages from senders whose ``address_bytes`` are in
+            this collection are ignored.
+        :param bool relay: If True, messages carry a `relay` header and each
+            radio relays the messages it receives on its channel, so they
+            reach radios out of range of the sender. Radios wait a random
+            time (up to the advertising duration) before relaying a message,
+            and don't if they've heard `relay.SUPPRESS` others relay it
+            first. Radios sending, relaying and receiving must all have this
+            set, and must call `update` regularly. This can't be used with
+            the ``batch`` or ``reliable`` settings.
+        :param int ttl: The number of times the radio's messages may be
+            relayed (0-255, default `relay.TTL`).
+        :param int slots: If greater than zero, time is divided into frames
+            of this many slots and the radio only advertises in its own slot
+            (see `adafruit_radio.schedule`), so radios on a busy channel
+            don't advertise over each other. An advertisement only starts if
+            it fits in the rest of the slot (or fills the slot, if longer).
+            The radio must have a send queue. Radios sending and receiving
+            must all have the same number of slots and slot time. Zero (the
+            default) turns this off.
+        :param int slot: The radio's slot (0 to slots - 1), by default
+            derived from its address. Radios should have different slots.
+        :param float slot_time: The length of each slot in seconds (default
+            `schedule.SLOT_TIME`).
+        :param bool beacon: If True, this radio sends beacons from which the
+            others take the time, so they agree when each slot is. One radio
+            on the channel should do this.
+        """
+        if channel is not None or channels is not None:
+            self._configure_channels(channel, channels)
+        if overflow is not None:
+            if overflow not in (DROP_OLDEST, DROP_NEWEST):
+                raise ValueError("Unknown overflow policy")
+            self._overflow = overflow
+        if batch is not None:
+            self._batch = batch
+        if fragment is not None:
+            self._reassembler = None
+            if fragment:
+                self._reassembler = Reassembler(
+                    REASSEMBLY_SIZE, FRAGMENT_TIMEOUT
+                )
+        if duration is not None:
+            if duration <= 0:
+                raise ValueError("Duration must be greater than zero")
+            self._duration = duration
+        if adaptive is not None:
+            self._adaptive = adaptive
+        if reliable is not None or window is not None:
+            self._configure_reliable(reliable, window)
+        self._configure_filters(minimum_rssi, allow, deny)
+        if wide_uid is not None:
+            self._wide_uid = wide_uid
+            self.uid %= 0x10000 if wide_uid else 0x100
+            self._senders = {}
+        self._configure_relay(relay, ttl)
+        if send_queue_size is not None:
+            self._configure_send_queue(send_queue_size)
+        self._configure_schedule(slots, slot, slot_time, beacon)
+
+    def _configure_channels(self, channel, channels):
+        """
+        Set the channel and other channels to listen on (either of which may
+        be None to leave it unchanged).
+        """
+        if channels is None:
+            channels = self._extra_channels
+        channels = tuple(channels)
+        for chan in channels + (channel,):
+            if chan is not None and not -1 < chan < 256:
+                raise ValueError("Channel must be in range 0-255")
+        if channel is not None:
+            self._channel = channel
+        self._extra_channels = channels
+        # Keep the queues (and any messages) of channels still listened to.
+        old_queues = self._rx_queues
+        self._rx_queues = {}
+        for chan in (self._channel,) + channels:
+            queue = old_queues.get(chan)
+            if queue is None:
+                queue = Queue(QUEUE_SIZE)
+            self._rx_queues[chan] = queue
+
+    def _configure_filters(self, minimum_rssi, allow, deny):
+        """
+        Set the filters applied to advertisements received (any of which may
+        be None to leave it unchanged).
+        """
+        if minimum_rssi is not None:
+            self._minimum_rssi = minimum_rssi
+        if allow is not None:
+            self._allow = frozenset(allow) or None
+        if deny is not None:
+            self._deny = frozenset(deny)
+
+    def _configure_reliable(self, reliable, window):
+        """
+        Turn reliable mode on or off and/or set its window (either of which
+        may be None to leave it unchanged).
+        """
+        if reliable is not None:
+            self._sender = Sender() if reliable else None
+            self._receiver = Receiver() if reliable else None
+        if window is not None:
+            if self._sender is None:
+                raise ValueError("Window only applies in reliable mode")
+            if not 0 < window <= MAX_WINDOW:
+                raise ValueError(
+                    "Window must be in range 1-{}".format(MAX_WINDOW)
+                )
+            self._sender.window = window
+
+    def _configure_relay(self, relay, ttl):
+        """
+        Turn relay mode on or off and/or set the TTL of messages sent (either
+        of which may be None to leave it unchanged).
+        """
+        if relay is not None:
+            self._relay = None
+            if relay:
+                self._relay = _relay.Relay(self.stats)
+        if ttl is not None:
+            if self._relay is None:
+                raise ValueError("TTL only applies in relay mode")
+            if not -1 < ttl < 256:
+                raise ValueError("TTL must be in range 0-255")
+            self._relay.ttl = ttl
+        if self._relay is not None and (
+            self._batch or self._sender is not None
+        ):
+            raise ValueError("Relay mode can't be used with batch or reliable")
+
+    def _configure_schedule(self, slots, slot, slot_time, beacon):
+        """
+        Set the number of slots, the radio's slot, the slot time and whether
+        the radio sends beacons (any of which may be None to leave it
+        unchanged).
+        """
+        old = self._schedule
+        if slots is not None or slot is not None or slot_time is not None:
+            if slots is None:
+                slots = old.slots if old else 0
+            self._schedule = None
+            if slots:
+                if slot is None and old and old.slots == slots:
+                    slot = old.slot
+                elif slot is None:
+                    slot = _schedule.slot_for(self.ble.address_bytes, slots)
+                if slot_time is None:
+                    slot_time = old.slot_time if old else _schedule.SLOT_TIME
+                self._schedule = _schedule.Schedule(
+                    slots, slot, slot_time, bool(old and old.beacon)
+                )
+        if beacon is not None:
+            if self._schedule is None:
+                raise ValueError("Beacons only apply when sending in slots")
+            self._schedule.beacon = beacon
+        if self._schedule is not None and self._tx_queue is None:
+            raise ValueError("A send queue is needed to send in slots")
+
+    def _configure_send_queue(self, size):
+        """
+        Replace the send queue with one of the given size (or no queue if
+        zero).
+        """
+        if size < 0:
+            raise ValueError("Send queue size must not be negative")
+        old_queue = self._tx_queue
+        self._tx_queue = None
+        if size:
+            self._tx_queue = Queue(size)
+        elif self._advertising_until is not None:
+            self.ble.stop_advertising()
+            self._advertising_until = None
+        # Keep (as many as fit of) any messages still waiting to be sent, or
+        # send them now if no longer queueing.
+        while old_queue:
+            item = old_queue.popleft()
+            if self._tx_queue is None:
+                self._advertise(self._pack(item[0], old_queue), item[1])
+            else:
+                self._tx_queue.append(item)
+
+    def send(self, message, duration=None):
+        """
+        Send a message string on the channel to which the radio is
+        broadcasting.
+
+        :param str message: The message string to broadcast.
+        :param float duration: How long (in seconds) to advertise the message,
+            if not the duration set by `configure`.
+        """
+        return self.send_bytes(message.encode("utf-8"), duration)
+
+    def send_bytes(self, message, duration=None):
+        """
+        Send bytes on the channel to which the radio is broadcasting.
+
+        If the radio has a send queue (see `configure`) the message is queued
+        and this returns at once, otherwise it blocks for the advertising
+        duration.
+
+        Receivers ignore copies of a message for their own configured duration,
+        so messages advertised for longer may be received more than once.
+
+        When fragmenting (see `configure`) long messages are sent as several
+        advertisements, so the send queue must have room for them all. In
+        reliable mode, messages are sent when there's room in the window
+        (see `update`).
+
+        :param bytes message: The bytes to broadcast.
+        :param float duration: How long (in seconds) to advertise the message,
+            if not the duration set by `configure`.
+        """
+        if duration is None:
+            duration = self._duration
+        # Ensure length of message (allowing for the length byte of a batch,
+        # the reliable or relay header and the header of each fragment).
+        max_length = MAX_LENGTH - 1 if self._batch else MAX_LENGTH
+        if self._wide_uid:
+            max_length -= 1
+        if self._sender is not None:
+            max_length -= HEADER_LENGTH
+        if self._relay is not None:
+            max_length -= _relay.HEADER_LENGTH
+        if self._schedule is not None:
+            max_length -= 1
+        chunk = max_length - 3
+        if self._reassembler is not None:
+            max_length = chunk * 255
+        if len(message) > max_length:
+            raise ValueError(
+                "Message too long (max length = {})".format(max_length)
+            )
+        if self._reassembler is None:
+            self._send(message, duration)
+            return
+        count = max(1, (len(message) + chunk - 1) // chunk)
+        msg_id = self._fragment_id
+        self._fragment_id = (msg_id + 1) % 256
+        for index in range(count):
+            header = struct.pack("<BBB", msg_id, index, count)
+            fragment = message[index * chunk : (index + 1) * chunk]
+            self._send(header + fragment, duration)
+
+    def _send(self, message, duration):
+        """
+        Send the message bytes, handing them to the reliable sender if in
+        reliable mode or adding the relay header if in relay mode.
+        """
+        if self._relay is not None:
+            message = self._relay.header(self.ble.address_bytes) + message
+        if self._sender is None:
+            self._transmit(message, duration)
+        else:
+            self._sender.add(message, duration)
+        self.update()
+
+    def _transmit(self, message, duration):
+        """
+        Queue the message bytes if the radio has a send queue, otherwise
+        advertise them now.
+        """
+        queue = self._tx_queue
+        if queue is None:
+            self._advertise(self._pack(message, None), duration)
+        elif not (queue.full() and self._overflow == DROP_NEWEST):
+            queue.append((message, duration))
+
+    def update(self):
+        """
+        Advertise queued messages (see the ``send_queue_size`` argument to
+        `configure`), each for its advertising duration. This never blocks
+        (unless in reliable mode without a send queue), so should be called
+        regularly, for instance on each pass through the main loop.
+
+        In reliable mode this also sends acknowledgements, resends messages
+        which haven't been acknowledged and sends new messages as the window
+        allows. In relay mode it relays messages as they fall due.
+
+        :return: True if there are still messages being sent, otherwise False.
+        """
+        now = self._time.monotonic()
+        if self._sender is not None:
+            self._update_reliable(now)
+        if self._relay is not None:
+            for message in self._relay.due(now):
+                self._transmit(message, self._duration)
+        if self._advertising_until is not None:
+            if now < self._advertising_until:
+                return True
+            self.ble.stop_advertising()
+            self._advertising_until = None
+        queue = self._tx_queue
+        if self._schedule is not None:
+            if self._start_in_slot(now):
+                return True
+        elif queue:
+            message, duration = queue.popleft()
+            self.ble.start_advertising(self._pack(message, queue))
+            self._advertising_until = now + duration
+            return True
+        # Messages may still be waiting in the queue (for the radio's slot),
+        # for acknowledgement or to be relayed.
+        for waiting in (queue, self._sender, self._relay):
+            if waiting:
+                return True
+        return False
+
+    def _start_in_slot(self, now):
+        """
+        If it's the radio's slot, start advertising a beacon (if one is due)
+        or the next queued message, provided it fits in the rest of the slot
+        or fills it. Returns True if advertising started.
+        """
+        schedule = self._schedule
+        slot_end = schedule.slot_end(now)
+        if slot_end is None:
+            return False
+        longest = slot_end - now
+        slot_time = schedule.slot_time
+        queue = self._tx_queue
+        beacon = None
+        if longest >= min(self._duration, slot_time):
+            beacon = schedule.beacon_due(now)
+        if beacon is not None:
+            advertisement = self._pack(beacon, None, _schedule.BEACON)
+            duration = self._duration
+        elif queue and longest >= min(queue.peek()[1], slot_time):
+            message, duration = queue.popleft()
+            advertisement = self._pack(message, queue)
+        else:
+            return False
+        self.ble.start_advertising(advertisement)
+        self._advertising_until = now + min(duration, longest)
+        return True
+
+    def _update_reliable(self, now):
+        """
+        Send the acknowledgements owed to other radios, then any messages
+        the reliable sender has ready.
+        """
+        for key, cumulative, bitmap in self._receiver.acks():
+            ack = struct.pack("<BB6sH", ACK, cumulative, key[1], bitmap)
+            self._transmit(ack, self._duration)
+        # Allow time for the messages already queued to be sent before
+        # expecting an acknowledgement.
+        queued = len(self._tx_queue) if self._tx_queue else 0
+        timeout = self._duration * (3 + queued)
+        for message, duration in self._sender.poll(now, timeout):
+            self._transmit(message, duration)
+
+    def _pack(self, message, queue, kind=_schedule.DATA):
+        """
+        Returns the advertisement for the given message: the channel and uid
+        header (and kind byte of the given kind, if sending in slots) followed
+        by the message. When batching, as many of the messages
+        waiting in the queue as fit are sent with it, each prefixed by a length
+        byte.
+
+        The same advertisement and buffer are reused for every message, so
+        nothing is allocated apart from a view of the buffer.
+        """
+        buf = self._tx_buffer
+        # Channel byte and "unique" id byte(s) (to avoid duplication when
+        # receiving messages in an AD_DURATION timeframe).
+        if self._wide_uid:
+            struct.pack_into("<BH", buf, 0, self._channel, self.uid)
+            end = 3
+        else:
+            struct.pack_into("<BB", buf, 0, self._channel, self.uid)
+            end = 2
+        # Increment (and reset if needed) the uid.
+        self.uid += 1
+        if self.uid > (0xFFFF if self._wide_uid else 255):
+            self.uid = 0
+        # The kind of advertisement, if sending in slots.
+        if self._schedule is not None:
+            buf[end] = kind
+            end += 1
+        count = 1
+        if self._batch:
+            while True:
+                buf[end] = len(message)
+                end += 1
+                buf[end : end + len(message)] = message
+                end += len(message)
+                if not queue or end + len(queue.peek()[0]) >= len(buf):
+                    break
+                message = queue.popleft()[0]
+                count += 1
+        else:
+            buf[end : end + len(message)] = message
+            end += len(message)
+        self._advertisement.msg = memoryview(buf)[:end]
+        stats = self.stats
+        stats.sent += count
+        if stats.send_hook is not None:
+            stats.send_hook(self._advertisement.msg)
+        return self._advertisement
+
+    def _advertise(self, advertisement, duration):
+        """
+        Advertise (block) for the given period of time.
+        """
+        start = self._time.monotonic()
+        self.ble.start_advertising(advertisement)
+        self._time.sleep(duration)
+        self.ble.stop_advertising()
+        self.stats.send_time += self._time.monotonic() - start
+
+    def start_listening(self, timeout=1):
+        """
+        Keep scanning in the background rather than starting and stopping a
+        scan on every call to `receive_full`. While listening, the scan is
+        only restarted when it times out and new messages are held in a queue
+        (of up to QUEUE_SIZE messages) from which `receive` and
+        `receive_full` pop.
+
+        :param float timeout: How long (in seconds) each scan runs before it
+            is restarted. This is also the longest a receive call will wait
+            when no message is queued.
+        """
+        self._scan_timeout = timeout
+        self._listening = True
+        if self._scan is None:
+            self._start_scan()
+
+    def stop_listening(self):
+        """
+        Stop the background scan started by `start_listening`.
+        """
+        if self._scan is not None:
+            self._scan = None
+            self.ble.stop_scan()
+        self._listening = False
+
+    def receive(self, channel=None):
+        """
+        Returns a message received on the channel on which the radio is
+        listening.
+
+        :param int channel: The channel to receive from, if not the one set
+            by `configure`.
+        :return: A string representation of the received message, or else None.
+        """
+        msg = self.receive_full(channel)
+        if msg:
+            return msg[0].decode("utf-8").replace("\x00", "")
+        else:
+            return None
+
+    def receive_full(self, channel=None):
+        """
+        Returns a tuple containing three values representing a message received
+        on the channel on which the radio is listening. If no message was
+        received then `None` is returned.
+
+        The three values in the tuple represent:
+
+        * the bytes received.
+        * the RSSI (signal strength: 0 = max, -255 = min).
+        * a microsecond timestamp: the value returned by time.monotonic() when
+          the message was received.
+
+        Messages already queued (while listening, see `start_listening`, or
+        from the rest of a batch or another channel) are returned before
+        scanning afresh.
+
+        :param int channel: The channel to receive from, if not the one set
+            by `configure`. It must be one the radio is listening on.
+        :return: A tuple representation of the received message, or else None.
+        """
+        msg = self._next(channel)
+        if msg:
+            return (bytes(msg[0]), msg[1], msg[2])
+        return None
+
+    def receive_into(self, buf, channel=None):
+        """
+        Copies the bytes of a message received on the channel on which the
+        radio is listening into the given buffer, avoiding the allocation of
+        a new bytes object for each message. If the message is longer than
+        the buffer, only as much as fits is copied.
+
+        :param bytearray buf: The buffer into which to copy the message.
+        :param int channel: The channel to receive from, if not the one set
+            by `configure`. It must be one the radio is listening on.
+        :return: The number of bytes copied, or None if no message was
+            received.
+        """
+        msg = self._next(channel)
+        if not msg:
+            return None
+        length = min(len(msg[0]), len(buf))
+        buf[:length] = msg[0][:length]
+        return length
+
+    def _next(self, channel):
+        """
+        Returns the next queued message tuple for the given channel, scanning
+        for one if none is queued, or else None.
+        """
+        queue = self._queue_for(channel)
+        if not queue:
+            self._wait((queue,), 1)
+        return queue.popleft()
+
+    def _wait(self, queues, timeout):
+        """
+        Scan until there's a new message in any of the given queues: using
+        the persistent scan if listening, or else a scan of up to `timeout`
+        seconds.
+        """
+        if self._listening:
+            self._pump(queues)
+            return
+        self.stats.scans += 1
+        start = self._time.monotonic()
+        try:
+            for entry in self.ble.start_scan(
+                AdafruitRadio,
+                minimum_rssi=self._minimum_rssi,
+                timeout=timeout,
+                extended=True,
+            ):
+                self._process(entry)
+                if any(queues):
+                    break
+        finally:
+            self.ble.stop_scan()
+            self.stats.scan_time += self._time.monotonic() - start
+
+    def receive_iter(self, timeout=1, channel=None):
+        """
+        A generator that yields every new message received on the channel on
+        which the radio is listening during a single scan, rather than only
+        the first one (as `receive_full` does). Each message is a tuple of the
+        same form as those returned by `receive_full`.
+
+        Queued messages are yielded first. If the radio is listening (see
+        `start_listening`) these are followed by those found until the current
+        scan times out.
+
+        :param float timeout: How long (in seconds) to scan for.
+        :param int channel: The channel to receive from, if not the one set
+            by `configure`. It must be one the radio is listening on.
+        """
+        queue = self._queue_for(channel)
+        while queue:
+            msg = queue.popleft()
+            yield (bytes(msg[0]), msg[1], msg[2])
+        if self._listening:
+            while self._pump((queue,)):
+                while queue:
+                    msg = queue.popleft()
+                    yield (bytes(msg[0]), msg[1], msg[2])
+            return
+        stats = self.stats
+        stats.scans += 1
+        start = self._time.monotonic()
+        try:
+            for entry in self.ble.start_scan(
+                AdafruitRadio,
+                minimum_rssi=self._minimum_rssi,
+                timeout=timeout,
+                extended=True,
+            ):
+                self._process(entry)
+                if queue:
+                    # Time the caller spends between messages isn't spent
+                    # blocked scanning.
+                    stats.scan_time += self._time.monotonic() - start
+                    start = None
+                    while queue:
+                        msg = queue.popleft()
+                        yield (bytes(msg[0]), msg[1], msg[2])
+                    start = self._time.monotonic()
+        finally:
+            self.ble.stop_scan()
+            if start is not None:
+                stats.scan_time += self._time.monotonic() - start
+
+    def on_message(self, handler, channel=None, prefix=None):
+        """
+        Register a function to be called by `poll` (or `run`) with each new
+        message received on the given channel, or only those messages
+        starting with the given prefix. The handler is called with the same
+        three values returned by `receive_full`::
+
+            def on_temperature(msg, rssi, timestamp):
+                print("Temperature", msg[5:])
+
+            radio.on_message(on_temperature, prefix="temp:")
+            radio.run()
+
+        Finding the handlers for a message takes a dictionary lookup for
+        each different length of prefix registered, so doesn't slow down as
+        more handlers are registered.
+
+        :param handler: The function to call.
+        :param int channel: The channel to handle messages from, if not the
+            one set by `configure`. It must be one the radio is listening on.
+        :param prefix: Only handle messages starting with these bytes (or
+            this string, encoded as UTF-8).
+        """
+        if channel is None:
+            channel = self._channel
+        self._queue_for(channel)
+        if isinstance(prefix, str):
+            prefix = prefix.encode("utf-8")
+        dispatcher = self._dispatchers.get(channel)
+        if dispatcher is None:
+            dispatcher = Dispatcher()
+            self._dispatchers[channel] = dispatcher
+        dispatcher.add(handler, prefix)
+
+    def poll(self, timeout=1):
+        """
+        Pass each new message received on the channels with handlers (see
+        `on_message`) to its handlers. If none are queued, this first scans
+        for up to `timeout` seconds (or, if listening, until the current scan
+        times out) until one is received. Messages on these channels which
+        don't match any handler are discarded.
+
+        :param float timeout: The longest time (in seconds) to scan for.
+        :return: The number of messages passed to a handler.
+        """
+        queues = []
+        for channel in self._dispatchers:
+            queue = self._rx_queues.get(channel)
+            if queue is not None:
+                queues.append(queue)
+        if queues and not any(queues):
+            self._wait(queues, timeout)
+        handled = 0
+        for channel, dispatcher in self._dispatchers.items():
+            queue = self._rx_queues.get(channel)
+            while queue:
+                msg = queue.popleft()
+                if dispatcher.dispatch(bytes(msg[0]), msg[1], msg[2]):
+                    handled += 1
+        return handled
+
+    def run(self, timeout=1):
+        """
+        Forever send queued messages (see `update`) and handle messages
+        received (see `poll`). Since each poll may scan for up to `timeout`
+        seconds, use `start_listening` (with a short timeout) or a short
+        timeout here if there are messages to send.
+
+        :param float timeout: The longest time (in seconds) each poll scans
+            for.
+        """
+        while True:
+            self.update()
+            self.poll(timeout)
+
+    def _queue_for(self, channel):
+        """
+        Returns the queue of received messages for the given channel (or the
+        configured channel if None).
+        """
+        if channel is None:
+            channel = self._channel
+        queue = self._rx_queues.get(channel)
+        if queue is None:
+            raise ValueError("Not listening on channel {}".format(channel))
+        return queue
+
+    def _start_scan(self):
+        """
+        Start the persistent scan used while listening.
+        """
+        self.stats.scans += 1
+        self._scan = iter(
+            self.ble.start_scan(
+                AdafruitRadio,
+                minimum_rssi=self._minimum_rssi,
+                timeout=self._scan_timeout,
+                extended=True,
+            )
+        )
+
+    def _pump(self, queues):
+        """
+        Read advertisements from the persistent scan until a new message is
+        in any of the given queues or the scan times out (in which case it's
+        restarted on the next call). Returns True if a queue has a message.
+        """
+        if self._scan is None:
+            self._start_scan()
+        start = self._time.monotonic()
+        try:
+            for entry in self._scan:
+                self._process(entry)
+                if any(queues):
+                    return True
+            self._scan = None
+            self.ble.stop_scan()
+            return False
+        finally:
+            self.stats.scan_time += self._time.monotonic() - start
+
+    def _process(self, entry):
+        """
+        Queue the message(s) in a scanned advertisement if it is new and on a
+        channel the radio is listening on, as (memoryview, rssi, timestamp)
+        tuples.
+        """
+        stats = self.stats
+        stats.heard += 1
+        stats.count_rssi(entry.rssi)
+        if stats.receive_hook is not None:
+            stats.receive_hook(entry)
+        # Ignore unwanted advertisements as early as possible: those on
+        # channels not listened to, then those from filtered senders.
+        msg = entry.msg
+        chan = msg[0]
+        queue = self._rx_queues.get(chan)
+        if queue is None:
+            stats.wrong_channel += 1
+            return
+        addr = entry.address.address_bytes
+        if addr in self._deny or (
+            self._allow is not None and addr not in self._allow
+        ):
+            stats.filtered += 1
+            return
+        now = self._time.monotonic()
+        # Remove expired entries.
+        stats.expired += self.msg_pool.expire(now - self._remember_for())
+        header = self._read_header(msg, addr, now)
+        if header is None:
+            return
+        metadata, start = header
+        relay = self._relay
+        # Ensure this message isn't a duplicate (or, when relaying, an echo
+        # of one of the radio's own).
+        if metadata in self.msg_pool or (
+            relay is not None and metadata[2] == self.ble.address_bytes
+        ):
+            self._duplicates += 1
+            stats.duplicates += 1
+            if relay is not None:
+                relay.heard(metadata, addr)
+            return
+        if self._adaptive:
+            self._adapt()
+        # Add new message's metadata to the msg_pool and queue it.
+        self.msg_pool.add(metadata, now)
+        # Messages are queued as views of the advertisement so they are only
+        # copied once they're returned.
+        msg = memoryview(msg)
+        if not self._batch:
+            if relay is not None and chan == self._channel:
+                ttl = msg[start - _relay.HEADER_LENGTH]
+                delay = random.random() * self._duration
+                relay.add(metadata, addr, ttl, msg[start:], now + delay)
+            self._deliver(queue, msg[start:], entry, now)
+            return
+        self._unpack(queue, msg, start, entry, now)
+
+    def _read_header(self, msg, addr, now):
+        """
+        Returns a (metadata, start) tuple for an advertisement from the given
+        address: the metadata identifying its message(s) and where they
+        start, after the headers. Returns None if it carries no messages.
+        """
+        # Extract the unique message ID byte(s).
+        chan = msg[0]
+        if self._wide_uid:
+            uid = msg[1] | msg[2] << 8
+            start = 3
+        else:
+            uid = msg[1]
+            start = 2
+        self._track(addr, uid)
+        # Message metadata is a tuple of (chan, uid, addr), to (mostly)
+        # uniquely identify a specific message in a certain time window.
+        # Relayed messages are identified by the sequence number and origin
+        # in their relay header instead, whichever radio relayed them.
+        metadata = (chan, uid, addr)
+        if self._schedule is not None:
+            start = self._read_kind(msg, start, metadata, now)
+            if start is None:
+                return None
+        if self._relay is not None:
+            metadata = self._relay.key(chan, msg, start)
+            if metadata is None:
+                return None
+            start += _relay.HEADER_LENGTH
+        return (metadata, start)
+
+    def _read_kind(self, msg, start, metadata, now):
+        """
+        Read the kind byte at `start` in an advertisement received while
+        sending in slots. Returns where the rest of the advertisement starts
+        if it carries messages, otherwise None. Beacons set the time when
+        first heard.
+        """
+        if len(msg) <= start:
+            return None
+        kind = msg[start]
+        if kind == _schedule.DATA:
+            return start + 1
+        if kind == _schedule.BEACON and metadata not in self.msg_pool:
+            self.msg_pool.add(metadata, now)
+            self._schedule.sync(memoryview(msg)[start + 1 :], now)
+        return None
+
+    def _unpack(self, queue, msg, start, entry, now):
+        """
+        Deliver each length prefixed message in a batch, starting at `start`
+        in the advertised bytes. A zero length (i.e. padding) marks the end.
+        """
+        i = start
+        while i < len(msg) and msg[i]:
+            end = i + 1 + msg[i]
+            self._deliver(queue, msg[i + 1 : end], entry, now)
+            i = end
+
+    def _remember_for(self):
+        """
+        Returns how long (in seconds) messages received are remembered, to
+        ignore copies of them.
+        """
+        if self._relay is not None:
+            return _relay.MEMORY
+        if self._adaptive:
+            return MAX_AD_DURATION
+        return self._duration
+
+    def _track(self, addr, uid):
+        """
+        Note the uid of an advertisement from the sender with the given
+        address, counting the messages missed if it's more than one after the
+        last uid heard from that sender.
+        """
+        sender = self._senders.get(addr)
+        if sender is None:
+            if len(self._senders) >= MAX_SENDERS:
+                del self._senders[next(iter(self._senders))]
+            self._senders[addr] = [uid, 0]
+            return
+        modulus = 0x10000 if self._wide_uid else 0x100
+        ahead = (uid - sender[0]) % modulus
+        # A uid well behind the last is probably from a sender which has
+        # restarted, rather than one so far ahead that messages were missed.
+        if 1 < ahead < modulus // 2:
+            self.stats.gaps += 1
+            self.stats.lost += ahead - 1
+            sender[1] += ahead - 1
+        sender[0] = uid
+
+    def senders(self):
+        """
+        Returns a list of (address_bytes, uid, lost) tuples for the senders
+        most recently heard: the sender's address, the uid of the last
+        message heard from it and the number of its messages missed (as
+        shown by gaps in the uids heard). Use the ``wide_uid`` setting (see
+        `configure`) for an accurate count if more than 128 messages in a
+        row may be missed.
+
+        Only messages on the channels listened to are heard, so messages a
+        sender sends on other channels are counted as missed.
+        """
+        return [(addr, s[0], s[1]) for addr, s in self._senders.items()]
+
+    def _adapt(self):
+        """
+        Called for each new message when in adaptive mode. Every 16 messages,
+        shorten the advertising duration if other radios' messages are being
+        heard several times each, or lengthen it if they're mostly heard only
+        once (so some are probably being missed altogether).
+        """
+        self._heard += 1
+        if self._heard < 16:
+            return
+        copies = self._duplicates / self._heard
+        if copies > 3:
+            self._duration = max(MIN_AD_DURATION, self._duration * 0.75)
+        elif copies < 0.5:
+            self._duration = min(MAX_AD_DURATION, self._duration * 1.5)
+        self._heard = 0
+        self._duplicates = 0
+
+    def _deliver(self, queue, msg, entry, now):
+        """
+        Queue a message received in the scanned advertisement, first
+        handling its reliable header if in reliable mode and reassembling it
+        from its fragments if fragmenting.
+        """
+        if self._receiver is not None:
+            if len(msg) < HEADER_LENGTH:
+                return
+            if msg[0] == ACK:
+                # Only acknowledgements of this radio's messages matter.
+                if (
+                    len(msg) >= ACK_LENGTH
+                    and bytes(msg[2:8]) == self.ble.address_bytes
+                ):
+                    self._sender.ack(msg[1], msg[8] | msg[9] << 8)
+                return
+            chan = entry.msg[0]
+            key = (chan, entry.address.address_bytes)
+            if not self._receiver.receive(key, msg[1], chan == self._channel):
+                return
+            msg = msg[HEADER_LENGTH:]
+        if self._reassembler is not None:
+            if len(msg) < 3:
+                return
+            msg_id, index, count = struct.unpack("<BBB", msg[:3])
+            key = (entry.msg[0], entry.address.address_bytes, msg_id)
+            msg = self._reassembler.add(key, index, count, msg[3:], now)
+            if msg is None:
+                return
+        self.stats.received += 1
+        queue.append((msg, entry.rssi, now))
@@ -0,0 +1,188 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2019 Nicholas H.Tollervey for Adafruit Industries
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+`adafruit_radio.buffers`
+================================================================================
+
+The fixed size containers used by `adafruit_radio.Radio` to queue messages,
+remember recent messages (to ignore duplicates) and reassemble fragmented
+messages. Their sizes are bounded so memory use doesn't grow with traffic.
+
+* Author(s): Nicholas H.Tollervey for Adafruit Industries
+"""
+
+
+class Queue:
+    """
+    A fixed capacity first-in-first-out queue backed by a preallocated list,
+    so appending and popping never allocate. When full, appending a new item
+    drops the oldest one.
+    """
+
+    def __init__(self, size):
+        self._items = [None] * size
+        self._head = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def full(self):
+        """
+        Returns True if appending another item would drop the oldest one.
+        """
+        return self._count == len(self._items)
+
+    def append(self, item):
+        """
+        Add an item to the end of the queue. Returns the oldest item if it was
+        dropped to make room, otherwise None.
+        """
+        size = len(self._items)
+        dropped = None
+        if self._count == size:
+            dropped = self.popleft()
+        self._items[(self._head + self._count) % size] = item
+        self._count += 1
+        return dropped
+
+    def peek(self):
+        """
+        Return the item at the front of the queue without removing it, or
+        None if the queue is empty.
+        """
+        if not self._count:
+            return None
+        return self._items[self._head]
+
+    def popleft(self):
+        """
+        Remove and return the item at the front of the queue, or None if the
+        queue is empty.
+        """
+        if not self._count:
+            return None
+        item = self._items[self._head]
+        self._items[self._head] = None
+        self._head = (self._head + 1) % len(self._items)
+        self._count -= 1
+        return item
+
+
+class MessagePool:
+    """
+    Timestamped message metadata, a (chan, uid, addr) tuple, used to mitigate
+    reporting duplicate messages received within a certain time frame.
+
+    Lookups are a single dict access and entries expire in the order they
+    were added, so the cost per message doesn't grow with the number of
+    senders. At most `size` entries are kept: when full, the oldest entry is
+    forgotten early.
+    """
+
+    def __init__(self, size):
+        self._times = {}
+        self._order = Queue(size)
+
+    def __len__(self):
+        return len(self._times)
+
+    def __contains__(self, metadata):
+        return metadata in self._times
+
+    def add(self, metadata, now):
+        """
+        Remember the message metadata as seen at time `now`.
+        """
+        dropped = self._order.append(metadata)
+        if dropped is not None:
+            del self._times[dropped]
+        self._times[metadata] = now
+
+    def expire(self, before):
+        """
+        Forget metadata for messages seen before the given time. Returns the
+        number of entries removed.
+        """
+        order = self._order
+        times = self._times
+        expired = 0
+        while order and times[order.peek()] < before:
+            del times[order.popleft()]
+            expired += 1
+        return expired
+
+
+class Reassembler:
+    """
+    Collects the fragments of messages too long for a single advertisement
+    until each message is complete. Incomplete messages are discarded after
+    `timeout` seconds, or (oldest first) if more than `size` bytes of
+    fragments are being held.
+    """
+
+    def __init__(self, size, timeout):
+        self._size = size
+        self._timeout = timeout
+        self._used = 0
+        # Maps a (chan, addr, msg_id) key to [started, parts, received].
+        self._pending = {}
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, key, index, count, data, now):
+        """
+        Add fragment number `index` of `count` and return the complete message
+        if this was the last missing fragment, otherwise None.
+        """
+        for old_key in [k for k, v in self._pending.items() if v[0] < now]:
+            self._discard(old_key)
+        if count == 1:
+            return data
+        pending = self._pending.get(key)
+        if pending is None or len(pending[1]) != count:
+            self._discard(key)
+            pending = [now + self._timeout, [None] * count, 0]
+            self._pending[key] = pending
+        parts = pending[1]
+        if index >= count or parts[index] is not None:
+            return None
+        parts[index] = data
+        pending[2] += 1
+        self._used += len(data)
+        if pending[2] == count:
+            self._discard(key)
+            return b"".join(parts)
+        while self._used > self._size:
+            self._discard(min(self._pending, key=lambda k: self._pending[k][0]))
+        return None
+
+    def _discard(self, key):
+        """
+        Forget the (possibly incomplete) message with the given key.
+        """
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            for part in pending[1]:
+                if part is not None:
+                    self._used -= len(part)
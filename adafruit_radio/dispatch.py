@@ -0,0 +1,87 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2019 Nicholas H.Tollervey for Adafruit Industries
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+`adafruit_radio.dispatch`
+================================================================================
+
+Routes received messages to the handlers registered for them with
+`adafruit_radio.Radio.on_message`.
+
+* Author(s): Nicholas H.Tollervey for Adafruit Industries
+"""
+
+
+class Dispatcher:
+    """
+    The handlers registered for one channel: those for every message, and
+    those for messages starting with a given prefix.
+
+    Handlers with a prefix are kept in a dict per prefix length, so finding
+    the handlers for a message takes one lookup for each different length
+    of prefix, however many handlers there are.
+    """
+
+    def __init__(self):
+        self._handlers = []
+        # Maps each prefix length to a dict of {prefix: [handlers]}.
+        self._prefixed = {}
+        # The prefix lengths, in order.
+        self._lengths = ()
+
+    def __len__(self):
+        count = len(self._handlers)
+        for prefixed in self._prefixed.values():
+            for handlers in prefixed.values():
+                count += len(handlers)
+        return count
+
+    def add(self, handler, prefix=None):
+        """
+        Register a handler for messages starting with the given prefix
+        (bytes), or for every message if the prefix is None or empty.
+        """
+        if not prefix:
+            self._handlers.append(handler)
+            return
+        prefixed = self._prefixed.get(len(prefix))
+        if prefixed is None:
+            prefixed = {}
+            self._prefixed[len(prefix)] = prefixed
+            self._lengths = tuple(sorted(self._prefixed))
+        prefixed.setdefault(bytes(prefix), []).append(handler)
+
+    def dispatch(self, msg, rssi, timestamp):
+        """
+        Call each handler for the message with the message bytes, RSSI and
+        timestamp. Returns the number of handlers called.
+        """
+        called = 0
+        for handler in self._handlers:
+            handler(msg, rssi, timestamp)
+            called += 1
+        for length in self._lengths:
+            if length > len(msg):
+                break
+            for handler in self._prefixed[length].get(msg[:length], ()):
+                handler(msg, rssi, timestamp)
+                called += 1
+        return called
@@ -0,0 +1,136 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2019 Nicholas H.Tollervey for Adafruit Industries
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+`adafruit_radio.relay`
+================================================================================
+
+Flooding of messages across several hops, used by `adafruit_radio.Radio`
+when configured to relay.
+
+Each relayed message starts with a nine byte header of (ttl, seq, origin):
+the number of hops it may still make, a 16 bit sequence number and the
+address of the radio which first sent it. Together the sequence number and
+origin identify the message however many radios relay it, so each radio
+receives and relays it only once.
+
+To avoid every radio in range relaying every message, a radio waits a random
+time before relaying one and doesn't relay it at all if it has heard enough
+other radios do so in the meantime (counter-based suppression).
+
+* Author(s): Nicholas H.Tollervey for Adafruit Industries
+"""
+import struct
+
+
+#: Length of the (ttl, seq, origin) header of each relayed message.
+HEADER_LENGTH = 9
+
+#: Default number of hops a message may make after it's first sent.
+TTL = 3
+
+#: A message isn't relayed if this many radios have been heard sending it.
+SUPPRESS = 3
+
+#: Maximum number of messages waiting to be relayed.
+MAX_PENDING = 16
+
+#: How long (in seconds) relayed messages are remembered, so copies arriving
+#: later by other routes are ignored.
+MEMORY = 10
+
+
+class Relay:
+    """
+    Adds the relay header to messages sent, and decides which messages
+    received are relayed and when. The numbers of messages relayed and
+    suppressed are counted in the given `adafruit_radio.stats.Stats`.
+    """
+
+    def __init__(self, stats, ttl=TTL):
+        if not -1 < ttl < 256:
+            raise ValueError("TTL must be in range 0-255")
+        self.ttl = ttl
+        self._stats = stats
+        self._seq = 0
+        # Maps a message's key to [relay_at, senders heard, message].
+        self._pending = {}
+
+    def __len__(self):
+        return len(self._pending)
+
+    def header(self, address):
+        """
+        Returns the relay header for the next message sent by this radio,
+        whose address is given.
+        """
+        header = struct.pack("<BH6s", self.ttl, self._seq, address)
+        self._seq = (self._seq + 1) % 0x10000
+        return header
+
+    def key(self, chan, msg, start):
+        """
+        Returns a (chan, seq, origin) tuple identifying the relayed message
+        on the given channel whose relay header is found at `start` in the
+        advertised bytes, or None if it's too short.
+        """
+        if len(msg) < start + HEADER_LENGTH:
+            return None
+        return (chan,) + struct.unpack_from("<H6s", msg, start + 1)
+
+    def add(self, key, sender, ttl, message, relay_at):
+        """
+        Relay a new message at the given time (if it may make more hops),
+        with the header (ttl, seq, origin) read from it. The message is
+        identified by `key` and was heard from `sender`.
+        """
+        if not ttl:
+            return
+        pending = self._pending
+        if len(pending) >= MAX_PENDING:
+            del pending[next(iter(pending))]
+        header = struct.pack("<BH6s", ttl - 1, key[1], key[2])
+        pending[key] = [relay_at, set((sender,)), header + bytes(message)]
+
+    def heard(self, key, sender):
+        """
+        Note that the message with the given key was heard again, from the
+        given sender.
+        """
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending[1].add(sender)
+
+    def due(self, now):
+        """
+        Returns a list of the messages to relay now. Messages heard from
+        SUPPRESS or more radios are dropped instead.
+        """
+        ready = []
+        pending = self._pending
+        for key in [k for k, v in pending.items() if v[0] <= now]:
+            item = pending.pop(key)
+            if len(item[1]) < SUPPRESS:
+                ready.append(item[2])
+                self._stats.relayed += 1
+            else:
+                self._stats.suppressed += 1
+        return ready
@@ -0,0 +1,182 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2019 Nicholas H.Tollervey for Adafruit Industries
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+`adafruit_radio.reliable`
+================================================================================
+
+Acknowledged delivery of messages with a sliding window of messages in
+flight, used by `adafruit_radio.Radio` when configured to be reliable.
+
+Each reliable message starts with a two byte header of (kind, seq). Data
+messages are numbered 0-255 in turn by each sender. Acknowledgements are
+cumulative (the next sequence number expected) plus a bitmap of the 16
+sequence numbers which follow it, so one acknowledgement covers a whole
+window and messages received out of order aren't resent.
+
+* Author(s): Nicholas H.Tollervey for Adafruit Industries
+"""
+import struct
+
+
+#: Kind byte of a data message.
+DATA = 0
+
+#: Kind byte of an acknowledgement.
+ACK = 1
+
+#: Length of the (kind, seq) header of each reliable message.
+HEADER_LENGTH = 2
+
+#: Length of an acknowledgement: the header, the 6 byte address of the
+#: sender being acknowledged and a 16 bit bitmap.
+ACK_LENGTH = HEADER_LENGTH + 8
+
+#: Largest number of messages which may be in flight at once.
+MAX_WINDOW = 16
+
+#: Number of times a message is sent before it's given up on.
+MAX_TRIES = 5
+
+#: Maximum number of senders whose sequence numbers are tracked.
+MAX_SENDERS = 32
+
+
+class Sender:
+    """
+    Numbers outgoing messages and keeps up to `window` of them in flight,
+    resending each until it's acknowledged or has been sent MAX_TRIES times.
+    """
+
+    def __init__(self, window=8):
+        if not 0 < window <= MAX_WINDOW:
+            raise ValueError(
+                "Window must be in range 1-{}".format(MAX_WINDOW)
+            )
+        self.window = window
+        #: Number of messages given up on without being acknowledged.
+        self.failed = 0
+        self._seq = 0
+        # Messages (and their advertising durations) waiting for room in the
+        # window.
+        self._backlog = []
+        # Maps sequence numbers to [message, resend_at, tries, duration].
+        self._in_flight = {}
+
+    def __len__(self):
+        return len(self._backlog) + len(self._in_flight)
+
+    def add(self, message, duration):
+        """
+        Add a message to be sent (when there's room in the window) for the
+        given advertising duration.
+        """
+        self._backlog.append((message, duration))
+
+    def ack(self, cumulative, bitmap):
+        """
+        Handle an acknowledgement of every message before sequence number
+        `cumulative`, and of those after it whose bits are set in `bitmap`.
+        """
+        for seq in list(self._in_flight):
+            after = (seq - cumulative) % 256
+            if after >= 128 or (0 < after <= 16 and bitmap >> (after - 1) & 1):
+                del self._in_flight[seq]
+
+    def poll(self, now, timeout):
+        """
+        Returns a list of (message, duration) tuples to send now: messages
+        not acknowledged within `timeout` seconds, followed by new messages
+        for which there is now room in the window.
+        """
+        ready = []
+        for seq in list(self._in_flight):
+            item = self._in_flight[seq]
+            if item[1] > now:
+                continue
+            if item[2] >= MAX_TRIES:
+                del self._in_flight[seq]
+                self.failed += 1
+                continue
+            item[1] = now + timeout
+            item[2] += 1
+            ready.append((item[0], item[3]))
+        while self._backlog and len(self._in_flight) < self.window:
+            message, duration = self._backlog.pop(0)
+            message = struct.pack("<BB", DATA, self._seq) + message
+            self._in_flight[self._seq] = [message, now + timeout, 1, duration]
+            self._seq = (self._seq + 1) % 256
+            ready.append((message, duration))
+        return ready
+
+
+class Receiver:
+    """
+    Tracks the sequence numbers received from each sender to ignore resent
+    messages, and which senders are owed an acknowledgement.
+    """
+
+    def __init__(self):
+        # Maps a sender's key to [expected, bits], where bit n of bits is set
+        # if sequence number expected + n has been received.
+        self._senders = {}
+        self._owed = set()
+
+    def receive(self, key, seq, ack=True):
+        """
+        Record receipt of sequence number `seq` from the sender identified by
+        `key`. Returns True if it's new, or False if it was resent. If `ack`
+        is True the sender is owed an acknowledgement.
+        """
+        state = self._senders.get(key)
+        if state is None:
+            if len(self._senders) >= MAX_SENDERS:
+                del self._senders[next(iter(self._senders))]
+            state = [seq, 0]
+            self._senders[key] = state
+        if ack:
+            self._owed.add(key)
+        ahead = (seq - state[0]) % 256
+        if ahead >= 128 or state[1] >> ahead & 1:
+            return False
+        if ahead > MAX_WINDOW:
+            # The sender gave up on the messages in between, so catch up.
+            state[0] = seq
+            state[1] = 0
+            ahead = 0
+        state[1] |= 1 << ahead
+        while state[1] & 1:
+            state[0] = (state[0] + 1) % 256
+            state[1] >>= 1
+        return True
+
+    def acks(self):
+        """
+        Returns a list of (key, cumulative, bitmap) acknowledgements owed to
+        senders, and forgets they are owed.
+        """
+        result = []
+        for key in self._owed:
+            state = self._senders.get(key)
+            if state is not None:
+                result.append((key, state[0], state[1] >> 1 & 0xFFFF))
+        self._owed = set()
+        return result
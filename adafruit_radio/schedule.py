@@ -0,0 +1,136 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2019 Nicholas H.Tollervey for Adafruit Industries
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+`adafruit_radio.schedule`
+================================================================================
+
+Time slots for sending, used by `adafruit_radio.Radio` when configured with
+a number of slots, so radios sharing a channel take turns rather than their
+advertisements colliding.
+
+Time is divided into frames of `slots` slots. Each radio only advertises in
+its own slot, which is derived from its address unless set. So that all the
+radios agree when each slot starts, one radio (or more) sends beacons giving
+its time. The others set their clocks by the beacons they hear.
+
+While scheduled, each advertisement starts with a kind byte: `DATA` or
+`BEACON`. The payload of a beacon is the sender's time in milliseconds
+(modulo 2**32) when it started advertising the beacon.
+
+* Author(s): Nicholas H.Tollervey for Adafruit Industries
+"""
+import struct
+
+
+#: Kind byte of an advertisement carrying messages.
+DATA = 0
+
+#: Kind byte of a beacon.
+BEACON = 1
+
+#: Default length (in seconds) of each slot.
+SLOT_TIME = 0.5
+
+#: Time (in seconds) between beacons.
+BEACON_INTERVAL = 10
+
+
+def slot_for(address, slots):
+    """
+    Returns the slot (0 to slots - 1) of the radio with the given address
+    bytes, from an FNV-1a hash of the address.
+    """
+    value = 0x811C9DC5
+    for byte in address:
+        value = ((value ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return value % slots
+
+
+class Schedule:
+    """
+    Works out when the radio's slot is, by the time of the beacons heard (or
+    its own time if `beacon` is True, in which case it sends the beacons).
+    """
+
+    def __init__(self, slots, slot, slot_time=SLOT_TIME, beacon=False):
+        if slots < 1:
+            raise ValueError("There must be at least one slot")
+        if not -1 < slot < slots:
+            raise ValueError("Slot must be in range 0-{}".format(slots - 1))
+        if slot_time <= 0:
+            raise ValueError("Slot time must be greater than zero")
+        self.slots = slots
+        self.slot = slot
+        self.slot_time = slot_time
+        self.beacon = beacon
+        self._heard = False
+        # Milliseconds added to the radio's time to get the beacon's time,
+        # and when (by the radio's time) the next beacon is due to be sent.
+        self._offset = 0
+        self._beacon_at = 0
+
+    @property
+    def synced(self):
+        """
+        True if the radio sends beacons or has heard one.
+        """
+        return self.beacon or self._heard
+
+    def network_ms(self, now):
+        """
+        Returns the time (in milliseconds, modulo 2**32) of the beacon radio
+        when it's `now` by this radio's time.
+        """
+        return (int(now * 1000) + self._offset) & 0xFFFFFFFF
+
+    def slot_end(self, now):
+        """
+        Returns the time at which the radio's slot ends if it's now in its
+        slot, otherwise None.
+        """
+        slot_ms = int(self.slot_time * 1000)
+        position = self.network_ms(now) % (slot_ms * self.slots)
+        start = self.slot * slot_ms
+        if start <= position < start + slot_ms:
+            return now + (start + slot_ms - position) / 1000
+        return None
+
+    def beacon_due(self, now):
+        """
+        Returns the payload of a beacon if this radio sends beacons and one
+        is due, in which case the next is due BEACON_INTERVAL seconds later.
+        Otherwise returns None.
+        """
+        if not self.beacon or now < self._beacon_at:
+            return None
+        self._beacon_at = now + BEACON_INTERVAL
+        return struct.pack("<I", self.network_ms(now))
+
+    def sync(self, payload, now):
+        """
+        Set the time by the payload of a beacon heard at time `now`.
+        """
+        if self.beacon or len(payload) < 4:
+            return
+        beacon_ms = struct.unpack_from("<I", payload)[0]
+        self._offset = (beacon_ms - int(now * 1000)) & 0xFFFFFFFF
+        self._heard = True
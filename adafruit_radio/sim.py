@@ -0,0 +1,374 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2019 Nicholas H.Tollervey for Adafruit Industries
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+`adafruit_radio.sim`
+================================================================================
+
+An in-process simulation of BLE advertising and scanning, so that many
+`adafruit_radio.Radio` instances can talk to each other on a host computer
+(for testing, or to measure how the protocol performs).
+
+All the simulated radios share an `Air`, which is also the clock the radios
+use: time only passes when a radio sleeps or waits for a scan, or when
+`Air.advance` is called. For example::
+
+    from adafruit_radio.sim import Air
+
+    air = Air(loss=0.1, seed=1)
+    sender = air.radio(send_queue_size=4)
+    receiver = air.radio()
+    receiver.start_listening(timeout=0.1)
+    sender.send("Hello")
+    while sender.update():
+        air.advance(0.01)
+        print(receiver.receive())
+
+While advertising, a simulated radio transmits its advertisement every
+advertising interval (plus a random delay of up to 10ms, as BLE does). Each
+transmission is heard by every scanning radio, after the configured latency,
+unless it's lost at random or collides with another transmission that
+overlaps it on the air.
+
+This module is intended for CPython.
+
+* Author(s): Nicholas H.Tollervey for Adafruit Industries
+"""
+import random
+import struct
+
+
+#: The largest random delay (in seconds) added to each advertising interval.
+ADV_DELAY = 0.01
+
+#: Number of scanned advertisements a simulated radio buffers before more are
+#: dropped.
+SCAN_BUFFER_SIZE = 64
+
+
+class Address:  # pylint: disable=too-few-public-methods
+    """
+    The address of a simulated radio, as found on scan entries.
+    """
+
+    def __init__(self, address_bytes):
+        self.address_bytes = address_bytes
+
+
+class ScanEntry:  # pylint: disable=too-few-public-methods
+    """
+    An advertisement heard by a simulated radio while scanning.
+    """
+
+    def __init__(self, msg, rssi, address):
+        self.msg = msg
+        self.rssi = rssi
+        self.address = address
+
+
+class SimulatedBLE:
+    """
+    A stand in for `adafruit_ble.BLERadio` which advertises and scans on a
+    shared `Air`. Create these with `Air.node`.
+    """
+
+    def __init__(self, air, address_bytes):
+        self.address_bytes = address_bytes
+        self.address = Address(address_bytes)
+        self._air = air
+        # The advertised bytes and interval, and when next to transmit them.
+        self._advertising = None
+        self._interval = 0.1
+        self._next_transmission = None
+        # Incremented on each start or stop of a scan, to end old scans.
+        self._scan_id = 0
+        self._scanning = False
+        self._scan_end = None
+        self._minimum_rssi = -80
+        self._buffer = []
+
+    @property
+    def advertising(self):
+        """
+        True if the radio is advertising.
+        """
+        return self._advertising is not None
+
+    def start_advertising(self, advertisement, interval=0.1, **_kwargs):
+        """
+        Start transmitting the bytes of the advertisement's message every
+        `interval` seconds.
+        """
+        self._advertising = bytes(advertisement.msg)
+        self._interval = interval
+        self._next_transmission = self._air.monotonic()
+
+    def stop_advertising(self):
+        """
+        Stop advertising.
+        """
+        self._advertising = None
+        self._next_transmission = None
+
+    def start_scan(
+        self, *_advertisement_types, minimum_rssi=-80, timeout=None, **_kwargs
+    ):
+        """
+        Start scanning and return an iterator of the `ScanEntry` objects
+        heard, ending after `timeout` seconds (if given). When nothing has been
+        heard, iterating advances the air's clock until something is.
+        """
+        self._scan_id += 1
+        self._scanning = True
+        self._minimum_rssi = minimum_rssi
+        self._buffer = []
+        self._scan_end = None
+        if timeout is not None:
+            self._scan_end = self._air.monotonic() + timeout
+        return self._scan(self._scan_id, self._scan_end)
+
+    def stop_scan(self):
+        """
+        Stop scanning.
+        """
+        self._scan_id += 1
+        self._scanning = False
+
+    def _scan(self, scan_id, end):
+        """
+        Yield buffered scan entries until the scan stops or times out.
+        """
+        while self._scan_id == scan_id:
+            if self._buffer:
+                yield self._buffer.pop(0)
+            elif not self._air.step(end):
+                break
+        if self._scan_id == scan_id:
+            self._scanning = False
+
+    def _hear(self, entry):
+        """
+        Called by the air when a transmission reaches this radio. Returns
+        True if the radio was scanning and had room to buffer it.
+        """
+        end = self._scan_end
+        if (
+            self._scanning
+            and (end is None or self._air.monotonic() <= end)
+            and entry.rssi >= self._minimum_rssi
+            and len(self._buffer) < SCAN_BUFFER_SIZE
+        ):
+            self._buffer.append(entry)
+            return True
+        return False
+
+
+class Clock:
+    """
+    The clock of a simulated radio which is `offset` seconds ahead of the
+    air's clock.
+    """
+
+    def __init__(self, air, offset):
+        self._air = air
+        self._offset = offset
+
+    def monotonic(self):
+        """
+        The radio's time (in seconds).
+        """
+        return self._air.monotonic() + self._offset
+
+    def sleep(self, seconds):
+        """
+        Let the given number of simulated seconds pass.
+        """
+        self._air.advance(seconds)
+
+
+class Air:  # pylint: disable=too-many-instance-attributes
+    """
+    The medium shared by simulated radios, and their clock.
+
+    :param float latency: Delay (in seconds) between a transmission and it
+        being heard.
+    :param float loss: Probability (0-1) that a radio doesn't hear a
+        transmission.
+    :param int rssi: The signal strength of every transmission heard (unless
+        changed for a pair of radios with `set_link`).
+    :param float airtime: How long (in seconds) each transmission occupies
+        the air. Transmissions overlapping each other collide and are lost.
+    :param seed: Seed for the random numbers used, to repeat a simulation.
+    """
+
+    def __init__(
+        self, latency=0.0, loss=0.0, rssi=-60, airtime=0.001, seed=None
+    ):  # pylint: disable=too-many-arguments
+        self.latency = latency
+        self.loss = loss
+        self.rssi = rssi
+        self.airtime = airtime
+        #: Counts of transmissions, transmissions lost in collisions and
+        #: advertisements heard by scanning radios.
+        self.transmissions = 0
+        self.collisions = 0
+        self.heard = 0
+        self._now = 0.0
+        self._random = random.Random(seed)
+        self._nodes = []
+        self._links = {}
+        # Transmissions on their way to be heard, as lists of
+        # [arrives_at, sender, msg, collided].
+        self._in_transit = []
+
+    def monotonic(self):
+        """
+        The simulated time (in seconds).
+        """
+        return self._now
+
+    def sleep(self, seconds):
+        """
+        Let the given number of simulated seconds pass.
+        """
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        """
+        Let the given number of simulated seconds pass, transmitting and
+        delivering advertisements as they fall due.
+        """
+        end = self._now + seconds
+        while self.step(end):
+            pass
+        self._now = max(self._now, end)
+
+    def node(self):
+        """
+        Returns a new `SimulatedBLE` radio sharing this air.
+        """
+        address = struct.pack(">HI", 0xC0DE, len(self._nodes))
+        node = SimulatedBLE(self, address)
+        self._nodes.append(node)
+        return node
+
+    def radio(self, offset=0.0, **args):
+        """
+        Returns a new `adafruit_radio.Radio` using a simulated radio sharing
+        this air, configured with the given arguments. The radio's clock is
+        ahead of the air's by `offset` seconds.
+        """
+        # Imported here as the Radio's own module needn't know about the
+        # simulation.
+        from adafruit_radio import Radio  # pylint: disable=import-outside-toplevel
+
+        clock = Clock(self, offset) if offset else self
+        return Radio(ble=self.node(), clock=clock, **args)
+
+    def set_link(self, sender, receiver, loss=None, rssi=None):
+        """
+        Change the loss and/or RSSI of transmissions from the `sender` radio
+        to the `receiver` radio (either may be a `SimulatedBLE` or a `Radio`
+        using one).
+        """
+        sender = getattr(sender, "ble", sender)
+        receiver = getattr(receiver, "ble", receiver)
+        link = self._links.get((sender, receiver), (self.loss, self.rssi))
+        self._links[(sender, receiver)] = (
+            link[0] if loss is None else loss,
+            link[1] if rssi is None else rssi,
+        )
+
+    def step(self, end=None):
+        """
+        Advance the clock to the next transmission or delivery (but not past
+        `end`) and handle it. Returns False if there was nothing to do before
+        `end`, in which case the clock is moved on to `end`.
+        """
+        sender = None
+        when = None
+        for node in self._nodes:
+            due = node._next_transmission  # pylint: disable=protected-access
+            if due is not None and (when is None or due < when):
+                sender = node
+                when = due
+        in_transit = self._in_transit
+        if in_transit and (when is None or in_transit[0][0] <= when):
+            sender = None
+            when = in_transit[0][0]
+        if when is None or (end is not None and when > end):
+            if end is not None:
+                self._now = max(self._now, end)
+            return False
+        self._now = max(self._now, when)
+        if sender is None:
+            self._deliver(self._in_transit.pop(0))
+        else:
+            self._transmit(sender)
+        return True
+
+    def _transmit(self, sender):
+        """
+        Put the sender's advertisement on the air and schedule its next
+        transmission.
+        """
+        # pylint: disable=protected-access
+        self.transmissions += 1
+        transmission = [
+            self._now + self.airtime + self.latency,
+            sender,
+            sender._advertising,
+            False,
+        ]
+        # Anything transmitted less than airtime ago overlaps this.
+        for other in self._in_transit:
+            if other[0] - self.latency > self._now:
+                if not other[3]:
+                    self.collisions += 1
+                other[3] = True
+                transmission[3] = True
+        if transmission[3]:
+            self.collisions += 1
+        self._in_transit.append(transmission)
+        self._in_transit.sort(key=lambda t: t[0])
+        sender._next_transmission = (
+            self._now
+            + sender._interval
+            + self._random.uniform(0, ADV_DELAY)
+        )
+
+    def _deliver(self, transmission):
+        """
+        Let every other scanning radio hear a transmission, unless it collided
+        or is lost.
+        """
+        _, sender, msg, collided = transmission
+        if collided:
+            return
+        for node in self._nodes:
+            if node is sender:
+                continue
+            loss, rssi = self._links.get((sender, node), (self.loss, self.rssi))
+            if loss and self._random.random() < loss:
+                continue
+            # pylint: disable=protected-access
+            if node._hear(ScanEntry(msg, rssi, sender.address)):
+                self.heard += 1
@@ -0,0 +1,129 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2019 Nicholas H.Tollervey for Adafruit Industries
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+`adafruit_radio.stats`
+================================================================================
+
+Counters kept by each `adafruit_radio.Radio` (as its ``stats`` attribute) to
+show what happens to the advertisements it sends and hears, and optional
+hooks called as it does so. Keeping the counts costs no more than adding to
+a few integers per advertisement, so they are always on.
+
+For example, to see why messages aren't arriving::
+
+    radio = Radio()
+    radio.receive()
+    stats = radio.stats
+    print(stats.heard, stats.wrong_channel, stats.duplicates, stats.received)
+
+* Author(s): Nicholas H.Tollervey for Adafruit Industries
+"""
+
+
+#: Width (in dB) of each bucket of the RSSI histogram.
+RSSI_BUCKET = 10
+
+#: Number of buckets in the RSSI histogram. The first counts everything
+#: below -90 dB, the last everything from -10 dB up.
+RSSI_BUCKETS = 10
+
+
+class Stats:  # pylint: disable=too-many-instance-attributes
+    """
+    Counts of what a radio has sent and heard, since it was created or the
+    counts were last `reset`:
+
+    * ``sent``: messages advertised (including fragments, acknowledgements,
+      resent messages and each message of a batch).
+    * ``heard``: advertisements heard while scanning.
+    * ``received``: new messages received and queued to be returned.
+    * ``duplicates``: advertisements ignored as copies of a message already
+      received.
+    * ``wrong_channel``: advertisements ignored as they're on a channel the
+      radio isn't listening on.
+    * ``filtered``: advertisements ignored as they're from a sender not
+      allowed (see the ``allow`` and ``deny`` arguments to
+      `adafruit_radio.Radio.configure`).
+    * ``expired``: entries expired from the message pool used to detect
+      duplicates.
+    * ``gaps``: gaps in the uids of advertisements heard from a sender,
+      showing messages were missed (see `adafruit_radio.Radio.senders`).
+    * ``lost``: messages missed, according to the gaps.
+    * ``relayed`` and ``suppressed``: messages relayed, and not relayed as
+      enough other radios were heard relaying them (see
+      `adafruit_radio.relay`).
+    * ``scans``: scans started.
+    * ``send_time`` and ``scan_time``: time (in seconds) spent blocked
+      advertising and scanning.
+    * ``rssi``: a histogram of the RSSI of advertisements heard, as a list
+      of counts in buckets of RSSI_BUCKET dB (see `rssi_bucket`).
+
+    The ``send_hook`` and ``receive_hook`` attributes may be set to functions
+    to be called on the radio's send and receive paths: ``send_hook(msg)``
+    with the bytes of each advertisement as it starts to be sent, and
+    ``receive_hook(entry)`` with each scan entry heard, before it's checked
+    for the channel or duplicates. Hooks shouldn't keep the objects they're
+    passed, since these are reused.
+    """
+
+    def __init__(self):
+        self.send_hook = None
+        self.receive_hook = None
+        self.rssi = [0] * RSSI_BUCKETS
+        self.reset()
+
+    def reset(self):
+        """
+        Set all the counts back to zero.
+        """
+        self.sent = 0
+        self.heard = 0
+        self.received = 0
+        self.duplicates = 0
+        self.wrong_channel = 0
+        self.filtered = 0
+        self.expired = 0
+        self.gaps = 0
+        self.lost = 0
+        self.relayed = 0
+        self.suppressed = 0
+        self.scans = 0
+        self.send_time = 0.0
+        self.scan_time = 0.0
+        rssi = self.rssi
+        for i in range(RSSI_BUCKETS):
+            rssi[i] = 0
+
+    def count_rssi(self, rssi):
+        """
+        Add the RSSI of an advertisement heard to the histogram.
+        """
+        self.rssi[rssi_bucket(rssi)] += 1
+
+
+def rssi_bucket(rssi):
+    """
+    Returns the index in the RSSI histogram of the bucket counting the given
+    RSSI.
+    """
+    index = (rssi + RSSI_BUCKET * RSSI_BUCKETS) // RSSI_BUCKET
+    return min(RSSI_BUCKETS - 1, max(0, index))
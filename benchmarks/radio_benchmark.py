@@ -0,0 +1,303 @@
+"""
+Benchmarks for the adafruit_radio module, run under CPython against the
+simulated radios in adafruit_radio.sim or a fake BLE radio (no hardware is
+needed).
+
+It measures:
+
+* throughput: messages per (simulated) second delivered from a number of
+  senders to a listening receiver, and the end-to-end latency percentiles.
+* receive: CPU time and temporary memory per scanned advertisement on the
+  receive path (including duplicate detection) as the number of senders,
+  and so the size of the message pool, grows.
+* send: CPU time and temporary memory per message sent through the send
+  queue.
+
+Results are printed and may be written as JSON (with --output) so they can be
+compared between releases. Run it from the root of the repository::
+
+    $ python benchmarks/radio_benchmark.py --output results.json
+
+Simulated throughput and latency are repeatable for a given --seed. CPU times
+depend on the machine.
+"""
+import argparse
+import json
+import os
+import platform
+import struct
+import sys
+import time
+import tracemalloc
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+try:
+    import adafruit_ble  # pylint: disable=unused-import
+except ImportError:
+    # adafruit_ble needs CircuitPython's _bleio. Nothing here uses real
+    # hardware, so plain stand-ins for the two names adafruit_radio imports
+    # are enough.
+    class AdafruitRadio:  # pylint: disable=too-few-public-methods
+        """
+        Stand in for adafruit_ble.advertising.adafruit.AdafruitRadio.
+        """
+
+        msg = b""
+
+    for module in (
+        "adafruit_ble",
+        "adafruit_ble.advertising",
+        "adafruit_ble.advertising.adafruit",
+    ):
+        sys.modules[module] = types.ModuleType(module)
+    sys.modules["adafruit_ble"].BLERadio = None
+    sys.modules[
+        "adafruit_ble.advertising.adafruit"
+    ].AdafruitRadio = AdafruitRadio
+
+# pylint: disable=wrong-import-position
+import adafruit_radio
+from adafruit_radio.buffers import MessagePool
+from adafruit_radio.sim import Air
+
+
+class FakeBLE:
+    """
+    A BLE radio which advertises nowhere and whose scans return the same
+    list of entries every time.
+    """
+
+    address_bytes = b"bench0"
+
+    def __init__(self, entries=()):
+        self.entries = entries
+
+    def start_advertising(self, advertisement, **_kwargs):
+        """
+        Do nothing.
+        """
+
+    def stop_advertising(self):
+        """
+        Do nothing.
+        """
+
+    def start_scan(self, *_args, **_kwargs):
+        """
+        Return the entries.
+        """
+        return self.entries
+
+    def stop_scan(self):
+        """
+        Do nothing.
+        """
+
+
+class TickingClock:
+    """
+    A clock which moves on a second every time it's read, so every call to
+    Radio.update finishes one advertisement and starts the next.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        """
+        Returns the time, then moves it on.
+        """
+        self.now += 1.0
+        return self.now
+
+    def sleep(self, seconds):
+        """
+        Move the time on without sleeping.
+        """
+        self.now += seconds
+
+
+def percentile(values, fraction):
+    """
+    Returns the value at the given fraction (0-1) of the sorted values.
+    """
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def temporary_bytes(operation, count):
+    """
+    Returns the average peak of memory allocated (and freed again) by each
+    of `count` calls to the operation.
+    """
+    tracemalloc.start()
+    total = 0
+    for _ in range(count):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        operation()
+        total += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return total / count
+
+
+def bench_throughput(senders, rate, seconds, loss, seed):
+    """
+    Each sender sends `rate` messages per second (through a send queue) for
+    the given number of simulated seconds, while a receiver listens.
+    """
+    air = Air(loss=loss, seed=seed)
+    receiver = air.radio()
+    radios = [air.radio(send_queue_size=8) for _ in range(senders)]
+    receiver.start_listening(timeout=0.01)
+    next_send = [i / (rate * senders) for i in range(senders)]
+    latencies = []
+    sent = 0
+    while air.monotonic() < seconds:
+        now = air.monotonic()
+        for i, radio in enumerate(radios):
+            if next_send[i] <= now:
+                radio.send_bytes(struct.pack("<Id", sent, now))
+                sent += 1
+                next_send[i] += 1 / rate
+            radio.update()
+        for msg in receiver.receive_iter():
+            latencies.append(air.monotonic() - struct.unpack("<Id", msg[0])[1])
+    return {
+        "senders": senders,
+        "rate": rate,
+        "seconds": seconds,
+        "loss": loss,
+        "sent": sent,
+        "received": len(latencies),
+        "messages_per_second": len(latencies) / seconds,
+        "latency_p50": percentile(latencies, 0.5),
+        "latency_p90": percentile(latencies, 0.9),
+        "latency_p99": percentile(latencies, 0.99),
+        "transmissions": air.transmissions,
+        "collisions": air.collisions,
+    }
+
+
+def bench_receive(senders, packets, copies, pool_size):
+    """
+    Time the receive path for advertisements from the given number of
+    senders, each message being heard `copies` times, with a message pool of
+    the given size.
+    """
+    # pylint: disable=too-many-locals
+    entries = []
+    uid = 0
+    while len(entries) < packets:
+        for sender in range(senders):
+            msg = struct.pack("<BB", 42, uid % 256) + b"telemetry"
+            address = types.SimpleNamespace(
+                address_bytes=struct.pack("<I", sender)
+            )
+            entry = types.SimpleNamespace(msg=msg, rssi=-60, address=address)
+            entries.extend([entry] * copies)
+        uid += 1
+    entries = entries[:packets]
+    radio = adafruit_radio.Radio(ble=FakeBLE(entries))
+    radio.msg_pool = MessagePool(pool_size)
+    start = time.perf_counter()
+    received = sum(1 for _ in radio.receive_iter())
+    elapsed = time.perf_counter() - start
+    # Then measure memory in the steady state: every message new, and the
+    # pool full.
+    ble = FakeBLE([None])
+    radio = adafruit_radio.Radio(ble=ble)
+    radio.msg_pool = MessagePool(pool_size)
+    unique = iter(entries[::copies] * 10)
+
+    def receive_one():
+        ble.entries[0] = next(unique)
+        radio.receive_full()
+
+    return {
+        "senders": senders,
+        "packets": packets,
+        "copies": copies,
+        "pool_size": pool_size,
+        "received": received,
+        "microseconds_per_packet": elapsed / packets * 1e6,
+        "temporary_bytes_per_message": temporary_bytes(receive_one, 1000),
+    }
+
+
+def bench_send(messages, batch):
+    """
+    Time sending messages through the send queue.
+    """
+    radio = adafruit_radio.Radio(
+        ble=FakeBLE(), clock=TickingClock(), send_queue_size=8, batch=batch
+    )
+    payload = b"telemetry"
+    start = time.perf_counter()
+    for _ in range(messages):
+        radio.send_bytes(payload)
+    while radio.update():
+        pass
+    elapsed = time.perf_counter() - start
+    return {
+        "messages": messages,
+        "batch": batch,
+        "microseconds_per_message": elapsed / messages * 1e6,
+        "temporary_bytes_per_message": temporary_bytes(
+            lambda: radio.send_bytes(payload), 1000
+        ),
+    }
+
+
+def main():
+    """
+    Run the benchmarks and report the results.
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n", maxsplit=1)[0]
+    )
+    parser.add_argument("--output", help="file to write JSON results to")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--quick", action="store_true", help="run shorter benchmarks"
+    )
+    args = parser.parse_args()
+    scale = 0.1 if args.quick else 1
+    results = {
+        "version": adafruit_radio.__version__,
+        "python": platform.python_version(),
+        "time": time.time(),
+        "throughput": [
+            bench_throughput(senders, rate, 60 * scale, loss, args.seed)
+            for senders in (1, 8, 32)
+            for rate in (1, 4)
+            for loss in (0.0, 0.2)
+        ],
+        "receive": [
+            bench_receive(senders, int(20000 * scale), 5, pool_size)
+            for senders in (1, 16, 64, 256)
+            for pool_size in (16, 64, 256)
+        ],
+        "send": [
+            bench_send(int(20000 * scale), batch) for batch in (False, True)
+        ],
+    }
+    for name in ("throughput", "receive", "send"):
+        print(name)
+        for result in results[name]:
+            print(
+                "  "
+                + ", ".join("{}={}".format(k, v) for k, v in result.items())
+            )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
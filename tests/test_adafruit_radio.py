@@ -4,6 +4,7 @@ found in the testconf.py file. See comments therein for explanation of how it
 works.
 """
 import adafruit_radio
+from adafruit_radio import buffers
 import pytest
 import struct
 import time
@@ -14,8 +15,13 @@ from unittest import mock
 def radio():
     """
     A fixture to recreate a new Radio instance for each test that needs it.
+
+    The instance is given its own mock BLERadio so calls made in one test
+    aren't seen by another.
     """
-    return adafruit_radio.Radio()
+    r = adafruit_radio.Radio()
+    r.ble = mock.MagicMock()
+    return r
 
 
 def test_radio_init_default():
@@ -24,13 +30,13 @@ def test_radio_init_default():
 
     * It has a BLERadio instance.
     * The self.uid counter is set to 0.
-    * The self.msg_pool is initialised as an empty set.
+    * The self.msg_pool is initialised empty.
     * The channel is set to the default 42.
     """
     r = adafruit_radio.Radio()
     assert r.ble == adafruit_radio.BLERadio()
     assert r.uid == 0
-    assert r.msg_pool == set()
+    assert len(r.msg_pool) == 0
     assert r._channel == 42
 
 
@@ -75,7 +81,7 @@ def test_radio_send(radio):
     radio.send_bytes = mock.MagicMock()
     msg = "Testing 1, 2, 3..."
     radio.send(msg)
-    radio.send_bytes.assert_called_once_with(msg.encode("utf-8"))
+    radio.send_bytes.assert_called_once_with(msg.encode("utf-8"), None)
 
 
 def test_radio_send_bytes_too_long(radio):
@@ -114,7 +120,7 @@ def test_radio_receive_no_message(radio):
     """
     radio.receive_full = mock.MagicMock(return_value=None)
     assert radio.receive() is None
-    radio.receive_full.assert_called_once_with()
+    radio.receive_full.assert_called_once_with(None)
 
 
 def test_radio_receive(radio):
@@ -152,7 +158,7 @@ def test_radio_receive_full_duplicate_message(radio):
     mock_entry.address.address_bytes = b"addr"
     mock_entry.rssi = -40
     radio.ble.start_scan.return_value = [mock_entry]
-    radio.msg_pool.add((time.monotonic(), 42, 0, b"addr"))
+    radio.msg_pool.add((42, 0, b"addr"), time.monotonic())
     assert radio.receive_full() is None
 
 
@@ -171,13 +177,621 @@ def test_radio_receive_full_and_remove_expired_message_metadata(radio):
     mock_entry.rssi = -40
     radio.ble.start_scan.return_value = [mock_entry]
     radio.msg_pool.add(
-        (time.monotonic() - adafruit_radio.AD_DURATION - 1, 42, 0, b"addr")
+        (42, 0, b"addr"), time.monotonic() - adafruit_radio.AD_DURATION - 1
     )
     result = radio.receive_full()
     assert result[0] == b"Hello"
     assert result[1] == -40
     assert len(radio.msg_pool) == 1
-    metadata = radio.msg_pool.pop()
-    assert metadata[1] == 42
-    assert metadata[2] == 1
-    assert metadata[3] == b"adr2"
+    assert (42, 0, b"addr") not in radio.msg_pool
+    assert (42, 1, b"adr2") in radio.msg_pool
+
+
+def make_entry(msg, addr=b"addr", rssi=-40):
+    """
+    Returns a mock scan entry for the given advertised message bytes.
+    """
+    entry = mock.MagicMock()
+    entry.msg = msg
+    entry.address.address_bytes = addr
+    entry.rssi = rssi
+    return entry
+
+
+def test_radio_start_listening_scans_once(radio):
+    """
+    While listening, a single scan is started and messages found in it are
+    queued, so several calls to receive_full don't restart the scan.
+    """
+    radio.ble.start_scan.return_value = [
+        make_entry(b"*\x00Hello"),
+        make_entry(b"*\x01World"),
+    ]
+    radio.start_listening(timeout=5)
+    assert radio.receive_full()[0] == b"Hello"
+    assert radio.receive_full()[0] == b"World"
+    radio.ble.start_scan.assert_called_once_with(
+        adafruit_radio.AdafruitRadio, minimum_rssi=-255, timeout=5,
+        extended=True
+    )
+    radio.ble.stop_scan.assert_not_called()
+    # The scan is exhausted so is stopped (and restarted on the next call).
+    assert radio.receive_full() is None
+    radio.ble.stop_scan.assert_called_once_with()
+
+
+def test_radio_stop_listening(radio):
+    """
+    Stopping listening stops the persistent scan and reverts receive_full to
+    scanning on each call.
+    """
+    radio.ble.start_scan.return_value = [
+        make_entry(b"*\x00Hello"),
+        make_entry(b"*\x01World"),
+    ]
+    radio.start_listening()
+    radio.receive_full()
+    radio.stop_listening()
+    radio.ble.stop_scan.assert_called_once_with()
+    assert radio._listening is False
+    assert radio._scan is None
+
+
+
+def test_radio_receive_iter(radio):
+    """
+    All new messages from a single scan are yielded (duplicates and other
+    channels are skipped) and the scan is stopped afterwards.
+    """
+    radio.ble.start_scan.return_value = [
+        make_entry(b"*\x00Hello"),
+        make_entry(b"*\x00Hello"),
+        make_entry(b"\x07\x00Other channel"),
+        make_entry(b"*\x00Hello", addr=b"adr2"),
+    ]
+    result = list(radio.receive_iter(timeout=2))
+    assert [m[0] for m in result] == [b"Hello", b"Hello"]
+    radio.ble.start_scan.assert_called_once_with(
+        adafruit_radio.AdafruitRadio, minimum_rssi=-255, timeout=2,
+        extended=True
+    )
+    radio.ble.stop_scan.assert_called_once_with()
+
+
+def test_radio_receive_iter_listening(radio):
+    """
+    While listening, queued messages are yielded first and then those found
+    before the persistent scan times out.
+    """
+    radio.ble.start_scan.return_value = [
+        make_entry(b"*\x00Hello"),
+        make_entry(b"*\x01World"),
+    ]
+    radio.start_listening()
+    radio._rx_queues[42].append((b"Queued", -30, 1.0))
+    result = list(radio.receive_iter())
+    assert [m[0] for m in result] == [b"Queued", b"Hello", b"World"]
+    radio.ble.stop_scan.assert_called_once_with()
+
+
+
+
+def test_radio_configure_keeps_unspecified_settings(radio):
+    """
+    Settings not passed to configure keep their current value.
+    """
+    radio.configure(channel=7)
+    radio.configure(send_queue_size=4)
+    assert radio._channel == 7
+    assert radio._tx_queue is not None
+
+
+def test_radio_configure_invalid_send_queue(radio):
+    """
+    A negative send queue size or unknown overflow policy raise ValueError.
+    """
+    with pytest.raises(ValueError):
+        radio.configure(send_queue_size=-1)
+    with pytest.raises(ValueError):
+        radio.configure(overflow=99)
+
+
+def test_radio_send_bytes_queued(radio):
+    """
+    With a send queue, send_bytes doesn't block: the first message is
+    advertised at once and update advertises the next after AD_DURATION.
+    """
+    radio.configure(send_queue_size=4)
+    with mock.patch("adafruit_radio.time.sleep") as mock_sleep, mock.patch(
+        "adafruit_radio.time.monotonic", return_value=10.0
+    ) as mock_monotonic:
+        radio.send_bytes(b"one")
+        radio.send_bytes(b"two")
+        mock_sleep.assert_not_called()
+        assert radio.ble.start_advertising.call_count == 1
+        assert radio.update() is True
+        assert radio.ble.start_advertising.call_count == 1
+        mock_monotonic.return_value = 10.0 + adafruit_radio.AD_DURATION
+        assert radio.update() is True
+        radio.ble.stop_advertising.assert_called_once_with()
+        assert radio.ble.start_advertising.call_count == 2
+        mock_monotonic.return_value = 11.0 + adafruit_radio.AD_DURATION
+        assert radio.update() is False
+        assert radio.ble.stop_advertising.call_count == 2
+
+
+def test_radio_send_bytes_queue_overflow(radio):
+    """
+    When the send queue is full, DROP_OLDEST discards the oldest waiting
+    message whereas DROP_NEWEST discards the message being sent.
+    """
+    radio.configure(send_queue_size=1)
+    radio.update = mock.MagicMock()
+    radio.send_bytes(b"one")
+    radio.send_bytes(b"two")
+    assert radio._tx_queue.peek()[0] == b"two"
+    radio.configure(overflow=adafruit_radio.DROP_NEWEST)
+    radio.send_bytes(b"three")
+    assert radio._tx_queue.peek()[0] == b"two"
+    assert len(radio._tx_queue) == 1
+
+
+def test_radio_send_bytes_batch(radio):
+    """
+    When batching, queued messages are sent together in one advertisement,
+    each prefixed by its length, up to MAX_LENGTH bytes.
+    """
+    radio.configure(send_queue_size=8, batch=True)
+    radio.update = mock.MagicMock()
+    radio.send_bytes(b"one")
+    radio.send_bytes(b"two")
+    radio.send_bytes(bytes(adafruit_radio.MAX_LENGTH - 5))
+    del radio.update
+    radio.update()
+    spy_advertisement = adafruit_radio.AdafruitRadio()
+    assert spy_advertisement.msg == b"*\x00\x03one\x03two"
+    # The large message didn't fit so is left for the next advertisement.
+    assert len(radio._tx_queue) == 1
+
+
+def test_radio_send_bytes_batch_too_long(radio):
+    """
+    Batched messages must leave room for their length byte.
+    """
+    radio.configure(batch=True)
+    with pytest.raises(ValueError):
+        radio.send_bytes(bytes(adafruit_radio.MAX_LENGTH))
+
+
+def test_radio_receive_full_batch(radio):
+    """
+    When batching, each message in a received advertisement is returned in
+    turn, ignoring any zero padding, from a single scan.
+    """
+    radio.configure(batch=True)
+    radio.ble.start_scan.return_value = [
+        make_entry(b"*\x00\x03one\x03two\x00\x00")
+    ]
+    assert radio.receive_full()[0] == b"one"
+    assert radio.receive_full()[0] == b"two"
+    radio.ble.start_scan.assert_called_once()
+
+
+def test_radio_configure_channels(radio):
+    """
+    Extra channels are listened to alongside the configured channel, and
+    changing the channel keeps the extra channels. Out of range channels
+    raise a ValueError.
+    """
+    radio.configure(channels=[1, 2])
+    assert set(radio._rx_queues) == {42, 1, 2}
+    radio.configure(channel=7)
+    assert set(radio._rx_queues) == {7, 1, 2}
+    with pytest.raises(ValueError):
+        radio.configure(channels=[256])
+
+
+def test_radio_receive_full_channels(radio):
+    """
+    Messages on each channel listened to are queued separately, and can be
+    read by channel, from a single scan.
+    """
+    radio.configure(channels=[1])
+    radio.ble.start_scan.return_value = [
+        make_entry(b"\x01\x00One"),
+        make_entry(b"\x02\x00Two"),
+        make_entry(b"*\x00Answer"),
+    ]
+    assert radio.receive_full()[0] == b"Answer"
+    assert radio.receive_full(channel=1)[0] == b"One"
+    radio.ble.start_scan.assert_called_once()
+    with pytest.raises(ValueError):
+        radio.receive_full(channel=2)
+
+
+def test_radio_send_bytes_fragment(radio):
+    """
+    When fragmenting, a message too long for one advertisement is sent as
+    several, each with a (msg_id, index, count) header.
+    """
+    radio.configure(fragment=True)
+    radio._send = mock.MagicMock()
+    chunk = adafruit_radio.MAX_LENGTH - 3
+    msg = bytes(range(256)) * 2
+    radio.send_bytes(msg)
+    sent = [c[0][0] for c in radio._send.call_args_list]
+    assert len(sent) == 3
+    assert sent[0] == b"\x00\x00\x03" + msg[:chunk]
+    assert sent[2] == b"\x00\x02\x03" + msg[chunk * 2 :]
+    assert b"".join(s[3:] for s in sent) == msg
+    radio.send_bytes(b"short")
+    radio._send.assert_called_with(
+        b"\x01\x00\x01short", adafruit_radio.AD_DURATION
+    )
+    with pytest.raises(ValueError):
+        radio.send_bytes(bytes(chunk * 255 + 1))
+
+
+def test_radio_receive_full_fragment(radio):
+    """
+    Fragments (in any order) are reassembled into the original message.
+    """
+    radio.configure(fragment=True)
+    radio.ble.start_scan.return_value = [
+        make_entry(b"*\x00\x05\x01\x02World"),
+        make_entry(b"*\x01\x05\x00\x02Hello "),
+    ]
+    assert radio.receive_full()[0] == b"Hello World"
+    assert len(radio._reassembler) == 0
+
+
+
+def test_radio_send_bytes_reuses_advertisement(radio):
+    """
+    The same advertisement and buffer are used for every message sent.
+    """
+    with mock.patch("adafruit_radio.time.sleep"):
+        radio.send_bytes(b"Hello")
+        first = radio.ble.start_advertising.call_args[0][0]
+        radio.send_bytes(b"Hi")
+        second = radio.ble.start_advertising.call_args[0][0]
+    assert first is second is radio._advertisement
+    assert radio._advertisement.msg == b"*\x01Hi"
+
+
+def test_radio_receive_into(radio):
+    """
+    The bytes of a received message are copied into the given buffer and
+    the number of bytes copied is returned, truncating to fit the buffer.
+    """
+    radio.ble.start_scan.return_value = [
+        make_entry(b"*\x00Hello"),
+        make_entry(b"*\x01World!"),
+    ]
+    buf = bytearray(5)
+    assert radio.receive_into(buf) == 5
+    assert buf == b"Hello"
+    radio.ble.start_scan.return_value = [make_entry(b"*\x02Hi")]
+    assert radio.receive_into(buf) == 2
+    assert buf[:2] == b"Hi"
+    radio.ble.start_scan.return_value = []
+    assert radio.receive_into(buf) is None
+
+
+def test_radio_send_bytes_duration(radio):
+    """
+    The advertising duration can be set for the radio and for each message.
+    """
+    radio.configure(duration=0.1)
+    with mock.patch("adafruit_radio.time.sleep") as mock_sleep:
+        radio.send_bytes(b"Hello")
+        mock_sleep.assert_called_once_with(0.1)
+        radio.send("Hi", duration=0.3)
+        mock_sleep.assert_called_with(0.3)
+    with pytest.raises(ValueError):
+        radio.configure(duration=0)
+
+
+def test_radio_receive_full_duplicate_window_follows_duration(radio):
+    """
+    Copies of a message are only ignored as duplicates within the configured
+    advertising duration.
+    """
+    radio.configure(duration=5)
+    radio.ble.start_scan.return_value = [make_entry(b"*\x00Hello")]
+    radio.msg_pool.add((42, 0, b"addr"), time.monotonic() - 2)
+    assert radio.receive_full() is None
+
+
+def test_radio_adaptive_duration(radio):
+    """
+    In adaptive mode the advertising duration is shortened when messages are
+    heard many times, and lengthened (up to MAX_AD_DURATION) when they're
+    heard only once.
+    """
+    radio.configure(adaptive=True)
+    entries = []
+    for uid in range(16):
+        entries += [make_entry(b"*" + bytes((uid,)) + b"Hi")] * 5
+    radio.ble.start_scan.return_value = entries
+    list(radio.receive_iter())
+    assert radio._duration == adafruit_radio.AD_DURATION * 0.75
+    for _ in range(10):
+        radio.msg_pool = buffers.MessagePool(adafruit_radio.POOL_SIZE)
+        radio.ble.start_scan.return_value = [
+            make_entry(b"*" + bytes((uid,)) + b"Hi") for uid in range(16)
+        ]
+        list(radio.receive_iter())
+    assert radio._duration == adafruit_radio.MAX_AD_DURATION
+
+
+def test_radio_send_bytes_reliable(radio):
+    """
+    In reliable mode, messages are sent with a (DATA, seq) header and resent
+    until acknowledged by an ACK addressed to this radio.
+    """
+    radio.ble.address_bytes = b"me1234"
+    radio.configure(send_queue_size=4, reliable=True)
+    with mock.patch("adafruit_radio.time.monotonic", return_value=0.0):
+        radio.send_bytes(b"Hello")
+    assert radio._advertisement.msg == b"*\x00\x00\x00Hello"
+    assert len(radio._sender) == 1
+    # An acknowledgement for another radio is ignored, then ours is handled.
+    radio.ble.start_scan.return_value = [
+        make_entry(b"*\x00\x01\x01other1\x00\x00"),
+        make_entry(b"*\x01\x01\x01me1234\x00\x00"),
+    ]
+    assert radio.receive_full() is None
+    assert len(radio._sender) == 0
+
+
+def test_radio_receive_full_reliable(radio):
+    """
+    In reliable mode, resent copies of a message are ignored and update sends
+    an acknowledgement to the sender.
+    """
+    radio.configure(send_queue_size=4, reliable=True)
+    radio.ble.start_scan.return_value = [
+        make_entry(b"*\x00\x00\x07Hello", addr=b"them12"),
+        make_entry(b"*\x01\x00\x07Hello", addr=b"them12"),
+    ]
+    assert radio.receive_full()[0] == b"Hello"
+    assert radio.receive_full() is None
+    radio.update()
+    assert radio._advertisement.msg == b"*\x00\x01\x08them12\x00\x00"
+
+
+def test_radio_configure_window(radio):
+    """
+    The window can only be set in reliable mode, and within bounds.
+    """
+    with pytest.raises(ValueError):
+        radio.configure(window=4)
+    radio.configure(reliable=True, window=4)
+    assert radio._sender.window == 4
+    with pytest.raises(ValueError):
+        radio.configure(window=adafruit_radio.reliable.MAX_WINDOW + 1)
+
+
+def test_radio_stats(radio):
+    """
+    The radio counts the advertisements it hears: new messages, duplicates,
+    those on other channels and their RSSI, and the scans it starts.
+    """
+    radio.msg_pool.add((42, 9, b"addr"), time.monotonic() - 10)
+    radio.ble.start_scan.return_value = [
+        make_entry(b"*\x00Hello", rssi=-45),
+        make_entry(b"*\x00Hello", rssi=-45),
+        make_entry(b"\x07\x01Other", rssi=-95),
+    ]
+    assert list(radio.receive_iter()) == [(b"Hello", -45, mock.ANY)]
+    stats = radio.stats
+    assert stats.heard == 3
+    assert stats.received == 1
+    assert stats.duplicates == 1
+    assert stats.wrong_channel == 1
+    assert stats.expired == 1
+    assert stats.scans == 1
+    assert stats.rssi[5] == 2
+    assert stats.rssi[0] == 1
+
+
+def test_radio_stats_hooks(radio):
+    """
+    The send and receive hooks are called with each advertisement sent and
+    each scan entry heard, and messages sent are counted.
+    """
+    sent = []
+    heard = []
+    radio.stats.send_hook = lambda msg: sent.append(bytes(msg))
+    radio.stats.receive_hook = heard.append
+    entry = make_entry(b"\x07\x00Other")
+    radio.ble.start_scan.return_value = [entry]
+    assert radio.receive_full() is None
+    assert heard == [entry]
+    radio.configure(send_queue_size=4, batch=True)
+    radio.send_bytes(b"a")
+    radio.send_bytes(b"b")
+    assert radio.stats.sent == 1
+    assert sent == [b"*\x00\x01a"]
+
+
+def test_radio_send_bytes_wide_uid(radio):
+    """
+    With wide uids, each message carries a two byte uid (leaving one byte
+    less for the message) which wraps at 65535.
+    """
+    radio.configure(wide_uid=True)
+    radio.uid = 0xFFFF
+    with mock.patch("adafruit_radio.time.sleep"):
+        radio.send_bytes(b"Hello")
+        assert radio.uid == 0
+        with pytest.raises(ValueError):
+            radio.send_bytes(bytes(adafruit_radio.MAX_LENGTH))
+    assert radio._tx_buffer[:8] == b"*\xff\xffHello"
+
+
+def test_radio_receive_full_wide_uid(radio):
+    """
+    Wide uids distinguish messages whose single byte uids would be the same.
+    """
+    radio.configure(wide_uid=True)
+    radio.ble.start_scan.return_value = [
+        make_entry(b"*\x01\x00One"),
+        make_entry(b"*\x01\x01Two"),
+    ]
+    assert [m[0] for m in radio.receive_iter()] == [b"One", b"Two"]
+
+
+def test_radio_senders_gaps(radio):
+    """
+    Gaps in the uids heard from each sender are counted as lost messages.
+    Duplicates and uids well behind the last (as if the sender restarted)
+    aren't.
+    """
+    radio.ble.start_scan.return_value = [
+        make_entry(b"*\x00A"),
+        make_entry(b"*\x00A"),
+        make_entry(b"*\x03B"),
+        make_entry(b"*\x00C", addr=b"adr2"),
+        make_entry(b"*\x01C"),
+    ]
+    assert len(list(radio.receive_iter())) == 4
+    assert radio.senders() == [(b"addr", 1, 2), (b"adr2", 0, 0)]
+    assert radio.stats.gaps == 1
+    assert radio.stats.lost == 2
+
+
+def test_radio_minimum_rssi(radio):
+    """
+    The configured minimum RSSI is passed to the scan.
+    """
+    radio.configure(minimum_rssi=-70)
+    radio.ble.start_scan.return_value = []
+    radio.receive_full()
+    radio.ble.start_scan.assert_called_once_with(
+        adafruit_radio.AdafruitRadio, minimum_rssi=-70, timeout=1,
+        extended=True
+    )
+
+
+def test_radio_allow_and_deny(radio):
+    """
+    Messages from senders not in the allow list (if any) or in the deny list
+    are ignored, and counted as filtered.
+    """
+    entries = [
+        make_entry(b"*\x00A", addr=b"addr"),
+        make_entry(b"*\x00B", addr=b"adr2"),
+        make_entry(b"*\x00C", addr=b"adr3"),
+    ]
+    radio.ble.start_scan.return_value = entries
+    radio.configure(allow=[b"addr", b"adr2"], deny=[b"adr2"])
+    assert [m[0] for m in radio.receive_iter()] == [b"A"]
+    assert radio.stats.filtered == 2
+    # An empty allow list allows any sender.
+    radio.msg_pool = buffers.MessagePool(adafruit_radio.POOL_SIZE)
+    radio.configure(allow=(), deny=())
+    assert len(list(radio.receive_iter())) == 3
+
+
+def test_radio_on_message_and_poll(radio):
+    """
+    Poll scans for messages and passes each to the handlers registered for
+    its channel and prefix.
+    """
+    temps = []
+    others = []
+    radio.configure(channels=[7])
+    radio.on_message(lambda *m: temps.append(m[0]), prefix="temp:")
+    radio.on_message(lambda *m: others.append(m[0]), channel=7)
+    radio.ble.start_scan.return_value = [
+        make_entry(b"*\x00temp:21"),
+        make_entry(b"*\x01hum:50"),
+        make_entry(b"\x07\x02Other"),
+    ]
+    assert radio.poll() == 1
+    # Each scan stops at the first new message. Those matching no handler
+    # are discarded.
+    assert radio.poll() == 0
+    assert radio.poll() == 1
+    assert temps == [b"temp:21"]
+    assert others == [b"Other"]
+    radio.ble.start_scan.return_value = []
+    assert radio.poll() == 0
+    with pytest.raises(ValueError):
+        radio.on_message(print, channel=9)
+
+
+def test_radio_relay(radio):
+    """
+    In relay mode messages sent carry a relay header, and new messages
+    received on the radio's channel are relayed. The radio's own messages
+    aren't received.
+    """
+    radio.ble.address_bytes = b"mine!!"
+    radio.configure(relay=True, ttl=1, send_queue_size=4)
+    radio.send_bytes(b"Hi")
+    advertisement = adafruit_radio.AdafruitRadio()
+    assert bytes(advertisement.msg) == b"*\x00\x01\x00\x00mine!!Hi"
+    radio.ble.start_scan.return_value = [
+        make_entry(b"*\x07\x01\x00\x00mine!!Hi"),
+        make_entry(b"*\x07\x02\x05\x00originHello"),
+    ]
+    assert [m[0] for m in radio.receive_iter()] == [b"Hello"]
+    assert len(radio._relay) == 1
+    with pytest.raises(ValueError):
+        radio.configure(batch=True)
+    with pytest.raises(ValueError):
+        adafruit_radio.Radio(ttl=3)
+
+
+def test_radio_slots(radio):
+    """
+    When sending in slots, messages carry a kind byte and are only
+    advertised in the radio's slot, for no longer than the rest of it.
+    """
+    with pytest.raises(ValueError):
+        radio.configure(slots=4)
+    with pytest.raises(ValueError):
+        radio.configure(beacon=True)
+    clock = mock.MagicMock()
+    clock.monotonic.return_value = 0.0
+    radio._time = clock
+    radio.configure(send_queue_size=4, slots=4, slot=1, slot_time=0.5)
+    radio.send_bytes(b"Hi", duration=0.4)
+    radio.ble.start_advertising.assert_not_called()
+    clock.monotonic.return_value = 0.75
+    # Only a quarter of a second of the slot is left.
+    assert radio.update()
+    radio.ble.start_advertising.assert_not_called()
+    clock.monotonic.return_value = 2.5
+    assert radio.update()
+    advertisement = adafruit_radio.AdafruitRadio()
+    assert bytes(advertisement.msg) == b"*\x00\x00Hi"
+    assert radio._advertising_until == 2.9
+
+
+def test_radio_beacon(radio):
+    """
+    A beacon radio sends beacons in its slot, and the beacons received by
+    other radios set the time of their slots.
+    """
+    clock = mock.MagicMock()
+    clock.monotonic.return_value = 1.0
+    radio._time = clock
+    radio.configure(
+        send_queue_size=4, slots=2, slot=0, slot_time=1.0, beacon=True
+    )
+    assert radio.update()
+    advertisement = adafruit_radio.AdafruitRadio()
+    assert bytes(advertisement.msg) == b"*\x00\x01\x10\x27\x00\x00"
+    receiver = adafruit_radio.Radio(ble=mock.MagicMock(), clock=clock)
+    receiver.configure(send_queue_size=4, slots=2, slot=0, slot_time=1.0)
+    receiver.ble.start_scan.return_value = [
+        make_entry(b"*\x00\x01\x10\x27\x00\x00")
+    ]
+    assert receiver.receive_full() is None
+    assert receiver._schedule.synced
+    # At 1.0 the beacon's time is 10.0, the start of slot 0.
+    assert receiver._schedule.slot_end(1.0) == 2.0
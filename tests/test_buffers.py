@@ -0,0 +1,66 @@
+"""
+Unit tests for the adafruit_radio.buffers module, whose fixed size containers
+queue, deduplicate and reassemble messages.
+"""
+from adafruit_radio import buffers
+
+
+def test_queue_drops_oldest_when_full():
+    """
+    The fixed size queue drops (and returns) the oldest item when full.
+    """
+    q = buffers.Queue(2)
+    assert q.append(1) is None
+    assert q.append(2) is None
+    assert q.append(3) == 1
+    assert len(q) == 2
+    assert q.popleft() == 2
+    assert q.popleft() == 3
+    assert q.popleft() is None
+
+
+def test_message_pool_is_bounded():
+    """
+    When the message pool is full the oldest metadata is forgotten, so memory
+    use is bounded regardless of how many senders there are.
+    """
+    pool = buffers.MessagePool(2)
+    pool.add((42, 0, b"a"), 1.0)
+    pool.add((42, 0, b"b"), 2.0)
+    pool.add((42, 0, b"c"), 3.0)
+    assert len(pool) == 2
+    assert (42, 0, b"a") not in pool
+    assert (42, 0, b"c") in pool
+
+
+def test_message_pool_expire():
+    """
+    Metadata seen before the given time is removed, oldest first, and the
+    number of removed entries is returned.
+    """
+    pool = buffers.MessagePool(3)
+    pool.add((42, 0, b"a"), 1.0)
+    pool.add((42, 1, b"a"), 2.0)
+    pool.add((42, 2, b"a"), 3.0)
+    assert pool.expire(2.5) == 2
+    assert len(pool) == 1
+    assert (42, 2, b"a") in pool
+    assert pool.expire(2.5) == 0
+
+
+def test_reassembler_timeout_and_size_limit():
+    """
+    Incomplete messages are discarded after the timeout, or oldest first
+    when the reassembly buffer is full.
+    """
+    reassembler = buffers.Reassembler(size=10, timeout=5)
+    assert reassembler.add("a", 0, 2, b"12345", 1.0) is None
+    assert reassembler.add("b", 0, 2, b"12345", 2.0) is None
+    assert len(reassembler) == 2
+    # Too many bytes held, so the oldest is dropped.
+    assert reassembler.add("c", 0, 2, b"12345", 3.0) is None
+    assert len(reassembler) == 2
+    assert reassembler.add("a", 1, 2, b"678", 3.0) is None
+    # Everything has timed out.
+    assert reassembler.add("d", 0, 1, b"whole", 9.0) == b"whole"
+    assert len(reassembler) == 0
@@ -0,0 +1,37 @@
+"""
+Unit tests for the adafruit_radio.dispatch module, which routes received
+messages to their handlers.
+"""
+from adafruit_radio import dispatch
+
+
+def test_dispatch_by_prefix():
+    """
+    Handlers without a prefix get every message, those with a prefix only
+    the messages starting with it.
+    """
+    calls = []
+    dispatcher = dispatch.Dispatcher()
+    dispatcher.add(lambda *m: calls.append(("all",) + m))
+    dispatcher.add(lambda *m: calls.append(("t",) + m), b"t")
+    dispatcher.add(lambda *m: calls.append(("temp",) + m), b"temp")
+    dispatcher.add(lambda *m: calls.append(("hum",) + m), b"hum")
+    assert len(dispatcher) == 4
+    assert dispatcher.dispatch(b"temp:21", -40, 1.0) == 3
+    assert calls == [
+        ("all", b"temp:21", -40, 1.0),
+        ("t", b"temp:21", -40, 1.0),
+        ("temp", b"temp:21", -40, 1.0),
+    ]
+    calls.clear()
+    assert dispatcher.dispatch(b"hu", -40, 2.0) == 1
+    assert calls == [("all", b"hu", -40, 2.0)]
+
+
+def test_dispatch_no_handlers():
+    """
+    A message matching no handler calls nothing.
+    """
+    dispatcher = dispatch.Dispatcher()
+    dispatcher.add(print, b"temp")
+    assert dispatcher.dispatch(b"other", -40, 1.0) == 0
@@ -0,0 +1,65 @@
+"""
+Unit tests for the adafruit_radio.relay module, which decides which messages
+are relayed in relay mode.
+"""
+from adafruit_radio import relay
+from adafruit_radio.stats import Stats
+import pytest
+
+
+def test_header():
+    """
+    Each message sent gets a (ttl, seq, origin) header with the next
+    sequence number.
+    """
+    r = relay.Relay(Stats(), ttl=2)
+    assert r.header(b"origin") == b"\x02\x00\x00origin"
+    assert r.header(b"origin") == b"\x02\x01\x00origin"
+    with pytest.raises(ValueError):
+        relay.Relay(Stats(), ttl=256)
+
+
+def test_key():
+    """
+    Messages are identified by channel, sequence number and origin.
+    """
+    r = relay.Relay(Stats())
+    msg = b"*\x05\x03\x01\x01originHi"
+    assert r.key(42, msg, 2) == (42, 257, b"origin")
+    assert r.key(42, msg[:10], 2) is None
+
+
+def test_relay_after_delay_with_lower_ttl():
+    """
+    A message is relayed when due, with its TTL reduced by one. Messages
+    with no hops left aren't relayed.
+    """
+    stats = Stats()
+    r = relay.Relay(stats)
+    r.add((42, 1, b"origin"), b"sender", 3, b"Hi", 1.0)
+    r.add((42, 2, b"origin"), b"sender", 0, b"Hi", 1.0)
+    assert len(r) == 1
+    assert r.due(0.5) == []
+    assert r.due(1.0) == [b"\x02\x01\x00originHi"]
+    assert len(r) == 0
+    assert stats.relayed == 1
+
+
+def test_suppression():
+    """
+    A message isn't relayed if it's been heard from SUPPRESS radios while
+    waiting.
+    """
+    stats = Stats()
+    r = relay.Relay(stats)
+    key = (42, 1, b"origin")
+    r.add(key, b"sender", 3, b"Hi", 1.0)
+    for sender in (b"sender", b"other1", b"other1"):
+        r.heard(key, sender)
+    r.heard((42, 2, b"origin"), b"other2")
+    assert r.due(1.0) == [b"\x02\x01\x00originHi"]
+    r.add(key, b"sender", 3, b"Hi", 2.0)
+    for sender in (b"other1", b"other2"):
+        r.heard(key, sender)
+    assert r.due(2.0) == []
+    assert stats.suppressed == 1
@@ -0,0 +1,95 @@
+"""
+Unit tests for the adafruit_radio.reliable module, which keeps track of the
+sequence numbers of messages sent and received in reliable mode.
+"""
+from adafruit_radio import reliable
+import pytest
+
+
+def test_sender_window():
+    """
+    Only `window` messages are sent before waiting for acknowledgements, each
+    with a (DATA, seq) header.
+    """
+    sender = reliable.Sender(window=2)
+    for msg in (b"a", b"b", b"c"):
+        sender.add(msg, 0.5)
+    ready = sender.poll(0.0, 1.0)
+    assert ready == [(b"\x00\x00a", 0.5), (b"\x00\x01b", 0.5)]
+    assert len(sender) == 3
+    # Acknowledging the first message makes room for the third.
+    sender.ack(1, 0)
+    assert sender.poll(0.5, 1.0) == [(b"\x00\x02c", 0.5)]
+    assert len(sender) == 2
+
+
+def test_sender_invalid_window():
+    """
+    The window must be in range 1 to MAX_WINDOW.
+    """
+    with pytest.raises(ValueError):
+        reliable.Sender(window=0)
+    with pytest.raises(ValueError):
+        reliable.Sender(window=reliable.MAX_WINDOW + 1)
+
+
+def test_sender_selective_ack():
+    """
+    Messages whose bit is set in the bitmap are acknowledged even though an
+    earlier message is missing.
+    """
+    sender = reliable.Sender(window=4)
+    for msg in (b"a", b"b", b"c"):
+        sender.add(msg, 0.5)
+    sender.poll(0.0, 1.0)
+    # Message 0 is missing but 2 has been received.
+    sender.ack(0, 0b10)
+    assert len(sender) == 2
+    assert sender.poll(1.0, 1.0) == [(b"\x00\x00a", 0.5), (b"\x00\x01b", 0.5)]
+
+
+def test_sender_resend_and_give_up():
+    """
+    Unacknowledged messages are resent after the timeout, and given up on
+    after MAX_TRIES attempts.
+    """
+    sender = reliable.Sender()
+    sender.add(b"a", 0.5)
+    assert len(sender.poll(0.0, 1.0)) == 1
+    assert sender.poll(0.5, 1.0) == []
+    now = 1.0
+    for _ in range(reliable.MAX_TRIES - 1):
+        assert sender.poll(now, 1.0) == [(b"\x00\x00a", 0.5)]
+        now += 1.0
+    assert sender.poll(now, 1.0) == []
+    assert sender.failed == 1
+    assert len(sender) == 0
+
+
+def test_receiver_ignores_resent_messages():
+    """
+    New sequence numbers are reported as such, while ones already received
+    (in or out of order) are not.
+    """
+    receiver = reliable.Receiver()
+    assert receiver.receive("a", 10) is True
+    assert receiver.receive("a", 10) is False
+    assert receiver.receive("a", 12) is True
+    assert receiver.receive("a", 12) is False
+    assert receiver.receive("a", 11) is True
+    assert receiver.receive("a", 9) is False
+    assert receiver.receive("b", 9) is True
+
+
+def test_receiver_acks():
+    """
+    Acknowledgements are cumulative plus a bitmap of messages received after
+    the first missing one, and are only owed once.
+    """
+    receiver = reliable.Receiver()
+    receiver.receive("a", 0)
+    receiver.receive("a", 2)
+    receiver.receive("a", 3)
+    receiver.receive("b", 5, ack=False)
+    assert receiver.acks() == [("a", 1, 0b11)]
+    assert receiver.acks() == []
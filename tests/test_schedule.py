@@ -0,0 +1,63 @@
+"""
+Unit tests for the adafruit_radio.schedule module, which works out when a
+radio may send when sending in slots.
+"""
+from adafruit_radio import schedule
+import pytest
+
+
+def test_slot_for():
+    """
+    A radio's slot is derived from its address, and is in range.
+    """
+    slots = [schedule.slot_for(bytes((i, 0, 0, 0, 0, 0)), 8) for i in range(8)]
+    assert all(0 <= slot < 8 for slot in slots)
+    assert len(set(slots)) > 1
+    assert schedule.slot_for(b"\x01\x00\x00\x00\x00\x00", 8) == slots[1]
+
+
+def test_invalid_schedule():
+    """
+    The slot must be one of the slots, of which there must be at least one.
+    """
+    with pytest.raises(ValueError):
+        schedule.Schedule(0, 0)
+    with pytest.raises(ValueError):
+        schedule.Schedule(4, 4)
+    with pytest.raises(ValueError):
+        schedule.Schedule(4, 0, slot_time=0)
+
+
+def test_slot_end():
+    """
+    The end of the radio's slot is returned only while in it.
+    """
+    s = schedule.Schedule(4, 1, slot_time=0.5)
+    assert s.slot_end(0.25) is None
+    assert s.slot_end(0.5) == 1.0
+    assert s.slot_end(0.75) == 1.0
+    assert s.slot_end(1.0) is None
+    assert s.slot_end(2.6) == 3.0
+
+
+def test_beacon_and_sync():
+    """
+    A beacon radio sends beacons every BEACON_INTERVAL with its time. Others
+    set their clocks by them, so agree when each slot is.
+    """
+    beacon = schedule.Schedule(4, 0, slot_time=0.5, beacon=True)
+    other = schedule.Schedule(4, 1, slot_time=0.5)
+    assert beacon.synced and not other.synced
+    payload = beacon.beacon_due(100.0)
+    assert payload is not None
+    assert beacon.beacon_due(101.0) is None
+    assert beacon.beacon_due(100.0 + schedule.BEACON_INTERVAL) is not None
+    assert other.beacon_due(100.0) is None
+    # The other radio's clock is 0.25s behind the beacon's.
+    other.sync(payload, 99.75)
+    assert other.synced
+    assert other.network_ms(99.75) == 100000
+    assert other.slot_end(100.25) == 100.75
+    # A beacon radio keeps its own time.
+    beacon.sync(b"\x00\x00\x00\x00", 0.0)
+    assert beacon.network_ms(1.0) == 1000
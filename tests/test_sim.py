@@ -0,0 +1,185 @@
+"""
+Unit tests for the adafruit_radio.sim module, which simulates BLE radios
+sharing the air so several Radio instances can be tested together.
+"""
+from adafruit_radio import sim
+
+
+def test_air_clock():
+    """
+    Simulated time only passes when the air is advanced or slept on.
+    """
+    air = sim.Air()
+    assert air.monotonic() == 0.0
+    air.advance(1.5)
+    air.sleep(0.5)
+    assert air.monotonic() == 2.0
+
+
+def test_radios_exchange_messages():
+    """
+    A message sent by one simulated radio is received (once) by another.
+    """
+    air = sim.Air(seed=1)
+    sender = air.radio()
+    receiver = air.radio()
+    receiver.start_listening(timeout=0.1)
+    sender.configure(send_queue_size=4)
+    sender.send("Hello")
+    received = []
+    while sender.update():
+        msg = receiver.receive()
+        if msg:
+            received.append(msg)
+    received += [m[0] for m in receiver.receive_iter()]
+    assert received == ["Hello"]
+    assert air.transmissions >= 4
+    assert air.monotonic() >= 0.5
+
+
+def test_blocking_send_advances_clock():
+    """
+    A blocking send sleeps on the air, during which the advertisement is
+    transmitted every advertising interval.
+    """
+    air = sim.Air(seed=1)
+    sender = air.radio()
+    sender.send("Hello")
+    assert air.monotonic() == 0.5
+    assert 4 <= air.transmissions <= 6
+    assert not sender.ble.advertising
+
+
+def test_loss_and_rssi():
+    """
+    A lossy link drops transmissions, and the RSSI of each link is reported
+    on scan entries (which are filtered by the minimum RSSI of the scan).
+    """
+    air = sim.Air(seed=1)
+    a = air.node()
+    b = air.node()
+    c = air.node()
+    air.set_link(a, b, rssi=-90)
+    air.set_link(a, c, loss=1.0)
+    scan_b = b.start_scan(minimum_rssi=-100, timeout=0.2)
+    scan_c = c.start_scan(timeout=0.2)
+    advertisement = type("Advertisement", (), {"msg": b"*\x00Hi"})()
+    a.start_advertising(advertisement)
+    air.advance(0.25)
+    entries = list(scan_b)
+    assert entries and all(e.rssi == -90 for e in entries)
+    assert entries[0].address.address_bytes == a.address_bytes
+    assert list(scan_c) == []
+
+
+def test_collisions():
+    """
+    Transmissions which overlap on the air are lost.
+    """
+    air = sim.Air(airtime=1.0, seed=1)
+    a = air.node()
+    b = air.node()
+    c = air.node()
+    scan = c.start_scan(timeout=0.05)
+    advertisement = type("Advertisement", (), {"msg": b"*\x00Hi"})()
+    a.start_advertising(advertisement)
+    b.start_advertising(advertisement)
+    assert list(scan) == []
+    assert air.collisions == 2
+
+
+def test_many_radios():
+    """
+    A listening radio receives a message from each of many queued senders
+    (which start sending at different times, so don't always collide).
+    """
+    air = sim.Air(seed=2)
+    receiver = air.radio()
+    receiver.start_listening(timeout=1)
+    senders = [air.radio(send_queue_size=2) for _ in range(20)]
+    for i, sender in enumerate(senders):
+        sender.send("Node {}".format(i))
+        air.advance(0.025)
+    received = set()
+    while any([sender.update() for sender in senders]):
+        received.update(m[0] for m in receiver.receive_iter())
+    assert len(received) == 20
+
+
+def test_stats_time_blocked():
+    """
+    The time a radio spends blocked sending and scanning is counted, but not
+    the time spent by the caller between messages yielded by receive_iter.
+    """
+    air = sim.Air(seed=1)
+    sender = air.radio()
+    receiver = air.radio()
+    sender.send("Hello")
+    assert sender.stats.send_time == 0.5
+    assert sender.stats.sent == 1
+    for _ in receiver.receive_iter(timeout=0.5):
+        air.advance(10)
+    assert receiver.stats.scans == 1
+    assert receiver.stats.scan_time == 0.5
+
+
+def test_relay():
+    """
+    In relay mode, a message reaches a radio out of range of its sender
+    through a radio in range of both, and is received once by each.
+    """
+    air = sim.Air(seed=1)
+    radios = [air.radio(send_queue_size=4, relay=True) for _ in range(3)]
+    a, b, c = radios
+    air.set_link(a, c, loss=1.0)
+    air.set_link(c, a, loss=1.0)
+    # Only one radio scans at a time, so scan for different times to avoid
+    # always missing the same transmissions.
+    for radio, timeout in zip(radios, (0.05, 0.03, 0.037)):
+        radio.start_listening(timeout=timeout)
+    a.send("Hello")
+    received = {b: [], c: []}
+    while air.monotonic() < 3:
+        for radio in radios:
+            radio.update()
+        for radio in (b, c):
+            received[radio] += [m[0] for m in radio.receive_iter()]
+    assert received == {b: [b"Hello"], c: [b"Hello"]}
+    assert b.stats.relayed == 1
+    assert b.stats.duplicates > 0
+
+
+def test_slots():
+    """
+    Radios sending in slots set their clocks by a beacon, after which their
+    advertisements don't collide.
+    """
+    air = sim.Air(seed=1)
+    receiver = air.radio()
+    receiver.start_listening(timeout=0.5)
+    senders = [
+        air.radio(
+            offset=i * 0.37,
+            send_queue_size=4,
+            slots=4,
+            slot=i,
+            slot_time=0.25,
+            duration=0.2,
+            beacon=i == 0,
+        )
+        for i in range(4)
+    ]
+    # Wait for a beacon.
+    while not all(sender._schedule.synced for sender in senders[1:]):
+        for sender in senders:
+            sender.update()
+            for _ in sender.receive_iter(timeout=0.01):
+                pass
+    collisions = air.collisions
+    for i, sender in enumerate(senders):
+        sender.send("Node {}".format(i))
+    received = set()
+    while any([sender.update() for sender in senders]):
+        received.update(m[0] for m in receiver.receive_iter())
+    assert len(received) == 4
+    assert air.collisions == collisions
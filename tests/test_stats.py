@@ -0,0 +1,36 @@
+"""
+Unit tests for the adafruit_radio.stats module, which counts what a Radio
+sends and hears.
+"""
+from adafruit_radio import stats
+
+
+def test_rssi_bucket():
+    """
+    RSSI values are counted in buckets of RSSI_BUCKET dB, with everything
+    beyond the first and last buckets counted in them.
+    """
+    assert stats.rssi_bucket(-200) == 0
+    assert stats.rssi_bucket(-91) == 0
+    assert stats.rssi_bucket(-90) == 1
+    assert stats.rssi_bucket(-45) == 5
+    assert stats.rssi_bucket(-10) == stats.RSSI_BUCKETS - 1
+    assert stats.rssi_bucket(0) == stats.RSSI_BUCKETS - 1
+
+
+def test_reset():
+    """
+    Resetting sets every count back to zero, but keeps the hooks.
+    """
+    s = stats.Stats()
+    hook = lambda msg: None
+    s.send_hook = hook
+    s.sent = 3
+    s.scan_time = 1.5
+    s.count_rssi(-45)
+    assert s.rssi[5] == 1
+    s.reset()
+    assert s.sent == 0
+    assert s.scan_time == 0.0
+    assert s.rssi == [0] * stats.RSSI_BUCKETS
+    assert s.send_hook is hook